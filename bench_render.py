@@ -0,0 +1,293 @@
+"""
+Benchmark pipeline render videogen_beta per tahap.
+
+Contoh:
+    python bench_render.py --output bench.json
+    python bench_render.py --quick --compare bench.json   # gagal (exit 1) jika ada tahap melambat
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import videogen_beta as vg
+
+
+BENCH_VERSION = 1
+REGRESSION_THRESHOLD = 1.15  # Tahap dianggap regresi jika median > 115% baseline
+
+KATA = (
+    "pemkot surabaya kembali mempercepat pembangunan fasilitas umum di sejumlah titik menjelang "
+    "libur akhir tahun koridor wisata kota warga jalur sepeda malam hari uji coba ruas protokol "
+    "kepolisian patroli kecelakaan lalu lintas umkm penjualan kuliner relokasi pedagang pasar "
+    "trotoar jalan darmo pejalan kaki sekolah negeri alat peraga digital rp juta miliar ke jawa"
+).split()
+
+
+# ---------- KORPUS SINTETIS ----------
+def _kalimat(rng, n_kata, highlight_ratio):
+    words = [rng.choice(KATA) for _ in range(n_kata)]
+    out = []
+    i = 0
+    while i < len(words):
+        if rng.random() < highlight_ratio:
+            n = rng.randint(1, 4)
+            out.append("[[" + " ".join(words[i:i + n]) + "]]")
+            i += n
+        else:
+            out.append(words[i])
+            i += 1
+    out[0] = out[0].capitalize()
+    return " ".join(out) + "."
+
+
+def buat_korpus(n_artikel, n_isi, kata_per_isi, highlight_ratio, seed=1234):
+    """Teks format data_berita.txt yang deterministik (seed tetap)."""
+    rng = random.Random(seed)
+    blocks = []
+    for _ in range(n_artikel):
+        lines = [
+            "Upper: " + _kalimat(rng, 3, 0.0),
+            "Judul: " + _kalimat(rng, rng.randint(5, 12), 0.0),
+            "Subjudul: " + _kalimat(rng, rng.randint(4, 10), 0.0),
+        ]
+        for _ in range(n_isi):
+            # Paragraf isi selalu punya highlight agar parser masuk ke state isi
+            lines.append(_kalimat(rng, kata_per_isi, max(highlight_ratio, 0.05)) + " [[" + rng.choice(KATA) + "]]")
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks) + "\n"
+
+
+def korpus_bench(quick=False):
+    scale = 0.2 if quick else 1.0
+    return {
+        "data_berita": None,
+        "banyak_artikel": buat_korpus(int(300 * scale) or 1, 4, 30, 0.15),
+        "paragraf_panjang": buat_korpus(int(20 * scale) or 1, 3, 120, 0.15, seed=99),
+        "highlight_padat": buat_korpus(int(20 * scale) or 1, 4, 40, 0.8, seed=7),
+    }
+
+
+# ---------- PENGUKURAN ----------
+def ukur(fn, repeat):
+    """Jalankan fn `repeat` kali; fn mengembalikan jumlah item yang diproses."""
+    times = []
+    items = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        items = fn()
+        times.append(time.perf_counter() - t0)
+    median = statistics.median(times)
+    return {
+        "median_s": round(median, 6),
+        "min_s": round(min(times), 6),
+        "repeat": repeat,
+        "items": items,
+        "per_item_ms": round(median * 1000.0 / items, 4) if items else None,
+    }
+
+
+def _paragraf(artikel):
+    for data in artikel:
+        for k, v in data.items():
+            if k.startswith("Isi_"):
+                yield v
+
+
+def _overlay_bench():
+    """Overlay asli jika ada; kalau tidak, overlay sintetis (logo semi-transparan) agar hasil bisa dibandingkan."""
+    layer = vg.load_overlay_layer() if os.path.exists(vg.OVERLAY_FILE) else None
+    if layer is not None:
+        return layer
+    w, h = vg.VIDEO_SIZE
+    rgba = np.zeros((h, w, 4), dtype=np.uint8)
+    rgba[40:200, 40:w - 40] = (255, 255, 255, 180)
+    rgba[h - 160:h - 40, :] = (0, 0, 0, 120)
+    return vg.OverlayLayer(rgba)
+
+
+def jalankan(args):
+    tmp_dir = tempfile.mkdtemp(prefix="vigen_bench_")
+    try:
+        return _jalankan(args, tmp_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _jalankan(args, tmp_dir):
+    stages = {}
+    korpus = korpus_bench(args.quick)
+
+    # 1. Parsing
+    paths = {}
+    for name, text in korpus.items():
+        if text is None:
+            paths[name] = args.input
+            continue
+        paths[name] = os.path.join(tmp_dir, f"{name}.txt")
+        with open(paths[name], "w", encoding="utf-8") as f:
+            f.write(text)
+    parsed = {}
+    for name, path in paths.items():
+        parsed[name] = vg.baca_semua_berita_stable(path)
+        stages[f"parse/{name}"] = ukur(lambda p=path: len(vg.baca_semua_berita_stable(p)), args.repeat)
+
+    font = vg.load_font_cached(vg.FONTS["isi"], vg.ISI_FONT_SIZE)
+
+    # 2. Layout (wrap) — cache ukuran dikosongkan agar angka mencerminkan run dingin + hangat
+    for name, artikel in parsed.items():
+        paragraf = list(_paragraf(artikel))
+
+        def layout(paragraf=paragraf):
+            vg._METRICS_CACHE.clear()
+            processor = vg.StableTextProcessor(font, vg.VIDEO_SIZE[0])
+            for teks in paragraf:
+                processor.smart_wrap_with_highlights(teks)
+            return len(paragraf)
+        stages[f"layout/{name}"] = ukur(layout, args.repeat)
+
+    # Layout opening (wrap + pencarian ukuran judul), cache layout dan ukuran dikosongkan
+    def layout_opening(artikel=parsed["banyak_artikel"]):
+        vg._LAYOUT_CACHE.clear()
+        vg._METRICS_CACHE.clear()
+        for d in artikel:
+            vg.layout_opening(d.get("Upper", ""), d.get("Judul", ""), d.get("Subjudul", ""), vg.FONTS)
+        return len(artikel)
+    stages["layout/opening"] = ukur(layout_opening, args.repeat)
+
+    # 3. Frame isi dan opening (tanpa hold: setiap indeks frame dirender)
+    for name in ("data_berita", "highlight_padat", "paragraf_panjang"):
+        artikel = parsed[name][:args.max_articles]
+        teks_list = list(_paragraf(artikel))[:args.max_blocks]
+        clips = [vg.render_text_block(t, vg.FONTS["isi"], vg.ISI_FONT_SIZE, vg.hitung_durasi_isi(t))
+                 for t in teks_list]
+
+        def body_frames(clips=clips):
+            n = 0
+            for clip in clips:
+                for i in range(clip.n_frames):
+                    clip.render_index(i)
+                    n += 1
+            return n
+        stages[f"frame_isi/{name}"] = ukur(body_frames, args.repeat)
+
+    openings = [vg.render_opening(d.get("Upper", ""), d.get("Judul", ""), d.get("Subjudul", ""), vg.FONTS)
+                for d in parsed["banyak_artikel"][:args.max_blocks]]
+
+    def opening_frames():
+        n = 0
+        for clip in openings:
+            for i in range(clip.n_frames):
+                clip.render_index(i)
+                n += 1
+        return n
+    stages["frame_opening/banyak_artikel"] = ukur(opening_frames, args.repeat)
+
+    # 4. Overlay
+    layer = _overlay_bench()
+    frame = np.array(vg.render_separator(1.0).frame(0))
+    out = np.empty_like(frame)
+
+    def overlay():
+        for _ in range(args.frames):
+            layer.apply(frame, out=out)
+        return args.frames
+    stages["overlay"] = ukur(overlay, args.repeat)
+
+    # 5. Encode per profil encoder (frame sudah jadi, hanya biaya pipe + ffmpeg)
+    clip = vg.render_text_block(next(_paragraf(parsed["data_berita"])), vg.FONTS["isi"], vg.ISI_FONT_SIZE, 5.0)
+    frames = [np.array(clip.render_index(i)) for i in range(min(args.frames, clip.n_frames))]
+    threads = args.ffmpeg_threads or vg.thread_encoder()
+
+    for profil in vg.ENCODER_PROFILES:
+        path = os.path.join(tmp_dir, f"bench_{profil}.mp4")
+
+        def encode(path=path, profil=profil):
+            writer = vg.FfmpegPipeWriter(path, vg.VIDEO_SIZE, vg.FPS, profile=profil, threads=threads)
+            n = 0
+            try:
+                for k in range(args.frames):
+                    writer.write(frames[k % len(frames)])
+                    n += 1
+            finally:
+                writer.close()
+            return n
+        stages[f"encode/{profil}"] = ukur(encode, args.repeat)
+        stages[f"encode/{profil}"]["bytes"] = os.path.getsize(path)
+
+    return stages
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except Exception:
+        return None
+
+
+def bandingkan(hasil, baseline_path, threshold):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    regresi = []
+    print(f"\n📊 Compare vs {baseline_path} (commit {base.get('commit')})")
+    for name, cur in hasil["stages"].items():
+        old = base.get("stages", {}).get(name)
+        if not old or not old.get("median_s"):
+            print(f"   {name:40s} (baru)")
+            continue
+        ratio = cur["median_s"] / old["median_s"]
+        flag = "❌" if ratio > threshold else "✅"
+        print(f"   {flag} {name:38s} {old['median_s']:.4f}s → {cur['median_s']:.4f}s  (x{ratio:.2f})")
+        if ratio > threshold:
+            regresi.append(name)
+    return regresi
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per tahap untuk videogen_beta")
+    parser.add_argument("--input", default="data_berita.txt")
+    parser.add_argument("--output", help="Tulis hasil JSON ke file ini")
+    parser.add_argument("--compare", help="File JSON hasil sebelumnya untuk dibandingkan")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--frames", type=int, default=120, help="Jumlah frame untuk tahap overlay & encode")
+    parser.add_argument("--max-articles", type=int, default=3)
+    parser.add_argument("--max-blocks", type=int, default=6)
+    parser.add_argument("--ffmpeg-threads", type=int, help="Default: semua core (vg.thread_encoder)")
+    parser.add_argument("--quick", action="store_true", help="Korpus sintetis lebih kecil")
+    args = parser.parse_args()
+
+    stages = jalankan(args)
+    hasil = {
+        "bench_version": BENCH_VERSION,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "params": vars(args),
+        "stages": stages,
+    }
+    for name, st in stages.items():
+        print(f"⏱️ {name:40s} median {st['median_s']:.4f}s  ({st['items']} items, {st['per_item_ms']} ms/item)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(hasil, f, indent=2)
+        print(f"💾 Saved: {args.output}")
+
+    if args.compare:
+        regresi = bandingkan(hasil, args.compare, args.threshold)
+        if regresi:
+            print(f"❌ Regression in {len(regresi)} stage(s)")
+            sys.exit(1)
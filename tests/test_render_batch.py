@@ -0,0 +1,72 @@
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import videogen_beta as vg  # noqa: E402
+
+# Render palsu di-patch sebelum worker di-fork; spawn/forkserver mengimpor ulang modul tanpa patch
+pytestmark = pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                                reason="worker harus di-fork agar memakai render palsu")
+
+MATI = "MATI"
+
+
+def render_palsu(data, i=None, **opts):
+    """Pengganti buat_video_stable: artikel berjudul MATI mematikan proses worker (seperti OOM kill)."""
+    if data["Judul"] == MATI:
+        os._exit(1)
+    return {"index": i, "judul": data["Judul"], "output": f"out_{i}.mp4", "ok": True, "error": None,
+            "seconds": 0.0}
+
+
+@pytest.fixture
+def artikel(monkeypatch):
+    monkeypatch.setattr(vg, "buat_video_stable", render_palsu)
+    monkeypatch.setattr(vg, "_warmup_worker", lambda: None)
+    # Artikel MATI dijadwalkan pertama (estimasi terpanjang)
+    monkeypatch.setattr(vg, "estimasi_durasi_artikel", lambda d: 100.0 if d["Judul"] == MATI else 1.0)
+    return [(0, {"Judul": "satu"}), (1, {"Judul": MATI}), (2, {"Judul": "tiga"}), (3, {"Judul": "empat"}),
+            (4, {"Judul": "lima"}), (5, {"Judul": "enam"})]
+
+
+def status_jurnal(path):
+    entries = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            rec = json.loads(line)
+            entries[rec["index"]] = rec["status"]
+    return entries
+
+
+def test_worker_mati_pool_sendiri_dibuat_ulang(artikel, tmp_path):
+    journal = str(tmp_path / "jurnal.jsonl")
+    results = vg.render_batch(artikel, workers=2, threads=1, journal=journal)
+
+    assert [r["index"] for r in results] == list(range(len(artikel)))
+    mati = results[1]
+    assert not mati["ok"] and mati["error"].startswith("BrokenProcessPool")
+    # Pool dibuat ulang: hanya artikel yang sedang berjalan bersama worker mati (workers=2) ikut gagal
+    gagal = [r for r in results if not r["ok"]]
+    assert len(gagal) <= 2 and all(r["error"].startswith("BrokenProcessPool") for r in gagal)
+    status = status_jurnal(journal)
+    assert set(status) == set(range(len(artikel)))
+    assert "running" not in status.values()
+
+
+def test_worker_mati_pool_pemanggil_berhenti_rapi(artikel, tmp_path):
+    journal = str(tmp_path / "jurnal.jsonl")
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        results = vg.render_batch(artikel, workers=2, threads=1, journal=journal, pool=pool)
+
+    assert [r["index"] for r in results] == list(range(len(artikel)))
+    assert not results[1]["ok"]
+    assert all(r["ok"] or r["error"].startswith("BrokenProcessPool") for r in results)
+    status = status_jurnal(journal)
+    assert set(status) == set(range(len(artikel)))
+    assert "running" not in status.values()
+
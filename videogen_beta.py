@@ -1,11 +1,38 @@
-from moviepy.editor import ImageClip, CompositeVideoClip, concatenate_videoclips, VideoClip
+from moviepy.editor import concatenate_videoclips, VideoClip
+from moviepy.config import get_setting
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
+import argparse
+import cProfile
+import csv
+import gc
+import hashlib
+import json
+import math
+import multiprocessing
 import os
+import queue
 import re
+import shutil
+import subprocess
+import signal
 import sys
+import tempfile
+import threading
 import time
 import traceback
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import shared_memory
+
+try:
+    import resource  # Tidak tersedia di Windows; peak RSS dilaporkan None
+except ImportError:
+    resource = None
 
 
 # ---------- KONFIGURASI ----------
@@ -15,6 +42,10 @@ BG_COLOR = (128, 128, 128)
 TEXT_COLOR = (255, 255, 255, 255)
 FPS = 24
 
+# Engine output: "moviepy" (compose + write_videofile), "pipe" (frame langsung ke stdin ffmpeg)
+# atau "segments" (segmen per paragraf di-encode paralel lalu digabung tanpa re-encode)
+OUTPUT_ENGINE = "moviepy"
+
 FONTS = {
     "upper": "Poppins-Bold.ttf",
     "judul": "DMSerifDisplay-Regular.ttf",
@@ -22,13 +53,108 @@ FONTS = {
     "isi": "Poppins-Bold.ttf",
 }
 
+# Layout didesain dalam piksel VIDEO_SIZE (resolusi master); resolusi render lain
+# (mis. draft) menskalakan posisi, ukuran font, margin dan overlay dari nilai ini
+MARGIN_X = 70
+MARGIN_KANAN = 90
+MARGIN_BAWAH_LOGO = 170
+BASELINE_FRAC = 0.60  # Teks mulai di 60% tinggi frame
+
+# Profil encoder libx264. Konten kita grafis warna datar di atas BG_COLOR dengan banyak
+# frame diam: tune animation + GOP panjang memperkecil file (keyframe paling mahal),
+# sedangkan kualitas yuv420p dibatasi subsampling chroma, bukan CRF.
+# crf/gop_s (detik) None = default x264.
+ENCODER_PROFILES = {
+    "standar": {"preset": "veryfast", "tune": "animation", "crf": 22, "gop_s": 20, "pix_fmt": "yuv420p"},
+    "cepat": {"preset": "superfast", "tune": "animation", "crf": 22, "gop_s": 20, "pix_fmt": "yuv420p"},
+    "arsip": {"preset": "slow", "tune": "animation", "crf": 16, "gop_s": 10, "pix_fmt": "yuv444p"},
+    "sosial": {"preset": "veryfast", "tune": "animation", "crf": 26, "gop_s": 20, "pix_fmt": "yuv420p"},
+    "draft": {"preset": "ultrafast", "tune": None, "crf": None, "gop_s": None, "pix_fmt": "yuv420p"},
+    # Aplikasi pesan: bitrate dibatasi (maxrate_k kbit/s, buffer 2x)
+    "pesan": {"preset": "veryfast", "tune": "animation", "crf": 28, "gop_s": 20, "pix_fmt": "yuv420p", "maxrate_k": 600},
+    # Perintah encode sebelum ada profil (preset medium, rate control default)
+    "lama": {"preset": "medium", "tune": None, "crf": None, "gop_s": None, "pix_fmt": "yuv420p"},
+}
+ENCODER_PROFILE = "standar"
+
+# Format piksel render (--yuv): "rgb24", atau "yuv420p" = layer dikonversi sekali ke bidang Y/U/V
+# (BT.601 limited range, seperti swscale), komposit langsung di YUV dan ffmpeg menerima yuv420p mentah.
+RENDER_PIX_FMT = "rgb24"
+
+# Varian output (--varian): timeline dirender sekali di ukuran varian terbesar (master);
+# varian lain di-downscale ffmpeg dari frame master dan di-encode di proses ffmpeg yang sama
+# (rasio berbeda dari master: fit + pad BG_COLOR)
+OUTPUT_VARIANTS = {
+    "reels": {"size": (720, 1280), "encoder": "standar"},
+    "hq": {"size": (1080, 1920), "encoder": "standar"},
+    "pesan": {"size": (540, 960), "encoder": "pesan"},
+}
+
+# Layout engine: ukuran desain, lalu ukuran terbesar yang muat di area aman dicari mulai dari
+# perkiraan (minimum FIT_MIN_FRAC x ukuran desain). Blok boleh naik dari baseline sejauh NAIK_MAKS_*
+# (piksel master) dengan jarak PAD_* dari batas bawah sebelum font dikecilkan.
+OPENING_FONT_SIZES = {"upper": 25, "judul": 60, "subjudul": 25}
+# PERUBAHAN 2: Penyesuaian jarak vertikal (Upper <-> Judul <-> Subjudul)
+OPENING_SPACING = {"upper_judul": 0, "judul_sub": 16}
+ISI_FONT_SIZE = 34
+FIT_MIN_FRAC = 0.6
+NAIK_MAKS_OPENING = 150
+PAD_OPENING = 20
+NAIK_MAKS_ISI = 250
+PAD_ISI = 40
+ORPHAN_WORDS = {'di', 'ke', 'rp', 'rupiah', 'juta', 'miliar', 'jawa', 'pos', 'ribu'}
+LAYOUT_CACHE_MAX_ENTRIES = 512
+
+# Mode draft: pratinjau cepat dengan layout identik hasil akhir
+DRAFT_SCALE = 0.5
+DRAFT_FPS = 12
+DRAFT_ENCODER_PROFILE = "draft"
+
 OVERLAY_FILE = "semangat.png"
+ASSET_CACHE_DIR = ".cache_aset"  # Cache overlay yang sudah di-resize (per path, mtime, ukuran)
+
+# Cache segmen ter-encode (engine "segments"), dikunci hash isi + semua parameter render
+RENDERER_VERSION = "4"  # Naikkan setiap kali tampilan frame berubah
+SEGMENT_CACHE_DIR = ".cache_segmen"
+SEGMENT_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+# Spool frame mentah (--spool-frame): frame ter-render di file memory-mapped, encode bisa diulang tanpa render.
+# Retensi: "gagal" = spool dihapus setelah encode sukses, disimpan jika encode gagal; "selalu" = selalu
+# disimpan. Total isi folder dibatasi FRAME_SPOOL_MAX_BYTES (LRU, spool yang dipakai ulang di-touch).
+FRAME_SPOOL_KEEP = "gagal"
+FRAME_SPOOL_MAX_BYTES = 20 * 1024 ** 3
+FRAME_SPOOL_ALIGN = 4096  # Header dan data frame rata halaman (mmap)
+
+# Jurnal batch (--journal/--resume): JSONL append-only per artikel (hash input, status, output, durasi)
+BATCH_JOURNAL = "batch_journal.jsonl"
+
+# Mode worker (--serve): interval cek folder spool/masuk saat antrian kosong
+SPOOL_POLL_S = 1.0
+
+# Mode buletin (--buletin): jeda separator antar berita (detik)
+BULETIN_SEPARATOR_S = 1.5
+
+# Frame tunggal (--still, --contact-sheet): thumbnail lembar kontak (skala VIDEO_SIZE), kolom, jarak antar thumbnail
+CONTACT_SHEET_SCALE = 0.25
+CONTACT_SHEET_KOLOM = 4
+CONTACT_SHEET_GAP = 8
+
+# Render frame paralel (--frame-workers): slot ring shared_memory dan jumlah unit per tugas worker
+FRAME_RING_DEPTH = 24
+FRAME_CHUNK = 6
+
+# Jumlah buffer frame yang dipakai bergiliran per klip (frame harus dikonsumsi sebelum buffer dipakai lagi)
+FRAME_POOL_DEPTH = 3
 
 # Highlight config
 HIGHLIGHT_COLOR = (0, 124, 188, 255)
 ISILINE_PADDING = 5  # Jarak vertikal antar baris isi
 HIGHLIGHT_SPEED_FRAC = 0.35  # Bagian durasi untuk sweep highlight (lebih smooth dari 0.25)
 
+# Cache ukuran teks (per file font + ukuran)
+MEASURE_CACHE_MAX_FONTS = 16  # Jumlah kombinasi font/ukuran yang disimpan
+MEASURE_CACHE_MAX_ENTRIES = 20000  # Jumlah entri kata/prefix per font
+
 
 # ---------- UTIL: FONT AMAN ----------
 def load_font_safe(font_path, size):
@@ -46,18 +172,385 @@ def load_font_safe(font_path, size):
             return None
 
 
+_FONT_CACHE = {}
+
+
+def load_font_cached(font_path, size):
+    """load_font_safe dengan cache per proses; font dipakai ulang antar blok dan artikel."""
+    key = (font_path, size)
+    if key not in _FONT_CACHE:
+        _FONT_CACHE[key] = load_font_safe(font_path, size)
+    return _FONT_CACHE[key]
+
+
 def ease_out_cubic(t):
     return 1.0 - pow(1.0 - t, 3.0)
 
 
+def ease_out_cubic_array(t):
+    """ease_out_cubic per elemen memakai pow libm: np.power bisa berbeda 1 ulp dan menggeser int()."""
+    t = np.asarray(t, dtype=np.float64)
+    return np.fromiter((ease_out_cubic(v) for v in t.ravel().tolist()), dtype=np.float64, count=t.size).reshape(t.shape)
+
+
+# ---------- SKALA RESOLUSI ----------
+def ukuran_skala(scale, size=VIDEO_SIZE):
+    """Ukuran frame untuk skala resolusi; sisi dibulatkan ke genap (syarat yuv420p)."""
+    return (max(2, int(round(size[0] * scale / 2.0)) * 2), max(2, int(round(size[1] * scale / 2.0)) * 2))
+
+
+def skala_dari(size):
+    """Faktor skala ukuran render terhadap layout master (VIDEO_SIZE)."""
+    return size[0] / float(VIDEO_SIZE[0])
+
+
+def font_skala(font, scale):
+    """Font yang sama pada ukuran diskalakan; font default PIL dipakai apa adanya."""
+    if scale == 1.0 or not isinstance(getattr(font, "path", None), str):
+        return font
+    return load_font_cached(font.path, max(1, int(round(font.size * scale))))
+
+
+# ---------- CACHE UKURAN TEKS ----------
+# Satu kanvas 1x1 dipakai ulang untuk semua pengukuran textbbox
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+
+
+class FontMetrics:
+    """
+    Tabel lebar teks untuk satu kombinasi (file font, ukuran).
+    Menyimpan lebar (dan sisi bawah bbox) kata utuh serta array lebar prefix (untuk highlight parsial),
+    masing-masing dengan eviction LRU sederhana.
+    """
+
+    def __init__(self, font, max_entries=MEASURE_CACHE_MAX_ENTRIES):
+        self.font = font
+        self.max_entries = max_entries
+        self.widths = OrderedDict()
+        self.bottoms = OrderedDict()
+        self.prefixes = OrderedDict()
+
+    def _bbox(self, text):
+        """(lebar, bawah bbox relatif titik gambar) dari satu kali textbbox."""
+        if self.font:
+            try:
+                bbox = _MEASURE_DRAW.textbbox((0, 0), text, font=self.font)
+                return max(0, bbox[2] - bbox[0]), bbox[3]
+            except:
+                pass
+        return len(text) * 15, 30
+
+    def _remember(self, table, key, value):
+        table[key] = value
+        if len(table) > self.max_entries:
+            table.popitem(last=False)
+        return value
+
+    def _measure(self, table, text):
+        value = table.get(text)
+        if value is not None:
+            table.move_to_end(text)
+            return value
+        w, bottom = self._bbox(text)
+        self._remember(self.widths, text, w)
+        self._remember(self.bottoms, text, bottom)
+        return table[text]
+
+    def width(self, text):
+        if not text:
+            return 0
+        return self._measure(self.widths, text)
+
+    def bottom(self, text):
+        """Sisi bawah bbox `text` (anchor kiri-atas), dari pengukuran yang sama dengan width()."""
+        if not text:
+            return 0
+        return self._measure(self.bottoms, text)
+
+    def prefix_widths(self, word):
+        """Tuple lebar word[:k] untuk k = 0..len(word)."""
+        arr = self.prefixes.get(word)
+        if arr is not None:
+            self.prefixes.move_to_end(word)
+            return arr
+        arr = tuple(self.width(word[:k]) if k else 0 for k in range(len(word) + 1))
+        return self._remember(self.prefixes, word, arr)
+
+
+_METRICS_CACHE = OrderedDict()
+
+
+def font_cache_key(font):
+    """Kunci cache font: (path file, ukuran); font tanpa path dikunci per objek."""
+    path = getattr(font, "path", None)
+    if not isinstance(path, str):
+        path = f"<font:{id(font)}>"
+    return (path, getattr(font, "size", None))
+
+
+def get_font_metrics(font):
+    key = font_cache_key(font)
+    metrics = _METRICS_CACHE.get(key)
+    if metrics is not None:
+        _METRICS_CACHE.move_to_end(key)
+        return metrics
+    metrics = FontMetrics(font)
+    _METRICS_CACHE[key] = metrics
+    if len(_METRICS_CACHE) > MEASURE_CACHE_MAX_FONTS:
+        _METRICS_CACHE.popitem(last=False)
+    return metrics
+
+
+# ---------- LAYOUT ENGINE ----------
+# Dipakai opening dan isi: wrap dari cache lebar kata, ukuran font terbesar yang muat
+# di area aman dicari biner, dan hasil layout (piksel master) di-cache per teks + font.
+def wrap_kata(words, metrics, available_width, orphans=None):
+    """
+    Greedy wrap daftar dict {'word', ...} dengan lebar "kata " dari FontMetrics
+    (jumlah lebar per kata, tanpa mengukur ulang prefix baris). Kata yang lebih
+    lebar dari available_width mendapat baris sendiri. Dengan `orphans`, kata
+    orphan di akhir baris dipindah ke baris berikutnya.
+    """
+    def is_orphan(word):
+        return orphans is not None and word.lower().strip('.,!?;:()[]{}"\'-') in orphans
+
+    lines = []
+    current = []
+    width_acc = 0
+
+    i = 0
+    while i < len(words):
+        w = words[i]
+        w_width = metrics.width(w['word'] + " ")
+
+        if width_acc + w_width <= available_width:
+            current.append(w)
+            width_acc += w_width
+            i += 1
+        else:
+            if current:
+                # Cek orphan terakhir
+                if len(current) > 1 and is_orphan(current[-1]['word']):
+                    orphan = current.pop()
+                    if current:
+                        lines.append(current)
+                    current = [orphan]  # mulai baris baru dengan orphan
+                    width_acc = metrics.width(orphan['word'] + " ")
+                else:
+                    lines.append(current)
+                    current = []
+                    width_acc = 0
+            else:
+                # Kata lebih panjang dari lebar tersedia — paksa pindah
+                lines.append([w])
+                i += 1
+    if current:
+        lines.append(current)
+
+    # Post-fix orphan sederhana antar-baris
+    for j in range(len(lines) - 1):
+        if len(lines[j]) >= 1 and is_orphan(lines[j][-1]['word']):
+            orphan = lines[j].pop()
+            lines[j + 1].insert(0, orphan)
+
+    return lines
+
+
+def wrap_paragraf(text, metrics, available_width):
+    """Teks polos (paragraf dipisah baris baru) -> string ter-wrap; paragraf kosong tetap baris kosong."""
+    out = []
+    for para in text.split("\n"):
+        words = [{'word': w} for w in para.split()]
+        if not words:
+            out.append("")
+            continue
+        out.extend(" ".join(w['word'] for w in line) for line in wrap_kata(words, metrics, available_width))
+    return "\n".join(out)
+
+
+def bawah_multiline(y, wrapped, metrics):
+    """
+    Sisi bawah multiline_textbbox((x, y), wrapped, spacing=4) tanpa mengukur ulang
+    baris: bawah baris = maks bawah "kata " (cache FontMetrics), jarak baris =
+    bawah "A" + 4 seperti ImageDraw.multiline_text.
+    """
+    line_spacing = metrics.bottom("A") + 4
+    bottom = y
+    for i, line in enumerate(wrapped.split("\n")):
+        words = line.split()
+        if words:
+            bottom = max(bottom, y + i * line_spacing + max(metrics.bottom(w + " ") for w in words))
+    return bottom
+
+
+def cari_ukuran_font(susun, ukuran, muat, min_frac=FIT_MIN_FRAC, tebak=None):
+    """
+    Layout dengan ukuran font terbesar <= `ukuran` yang muat: susun(ukuran) dicoba
+    dulu, lalu pencarian biner sampai ukuran*min_frac. Dengan `tebak` (layout
+    ukuran desain -> perkiraan ukuran), pencarian mulai dari perkiraan dan
+    memeriksa tetangganya dulu; biasanya cukup 2-3 layout. Jika ukuran minimum
+    pun tidak muat, layout ukuran minimum dipakai.
+    """
+    layout = susun(ukuran)
+    if muat(layout):
+        return layout
+    lo = hi_min = max(1, int(ukuran * min_frac))
+    hi = ukuran - 1
+    best = None
+    mid = int(tebak(layout)) if tebak else None
+    langkah = 0
+    while lo <= hi:
+        if mid is None or not lo <= mid <= hi or langkah >= 3:
+            mid = (lo + hi) // 2
+        candidate = susun(mid)
+        langkah += 1
+        if muat(candidate):
+            best, lo = candidate, mid + 1
+            mid += 1
+        else:
+            hi = mid - 1
+            mid -= 1
+    return best if best is not None else susun(hi_min)
+
+
+def tebak_ukuran(ukuran, tinggi, ruang):
+    """Perkiraan ukuran font agar teks setinggi `tinggi` muat di `ruang` (luas teks ~ ukuran^2)."""
+    if tinggi <= 0 or ruang <= 0:
+        return 0
+    return ukuran * math.sqrt(ruang / tinggi)
+
+
+def posisi_aman(y_start, tinggi, naik_maks, pad):
+    """
+    Posisi atas blok di area aman: tetap di baseline jika muat, kalau tidak naik
+    secukupnya (+pad) tapi tidak lebih dari naik_maks.
+    """
+    kelebihan = y_start + tinggi - (VIDEO_SIZE[1] - MARGIN_BAWAH_LOGO)
+    if kelebihan <= 0:
+        return y_start
+    return y_start - min(kelebihan + pad, naik_maks)
+
+
+_LAYOUT_CACHE = OrderedDict()
+
+
+def _cache_layout(key, build):
+    layout = _LAYOUT_CACHE.get(key)
+    if layout is not None:
+        _LAYOUT_CACHE.move_to_end(key)
+        return layout
+    layout = build()
+    _LAYOUT_CACHE[key] = layout
+    if len(_LAYOUT_CACHE) > LAYOUT_CACHE_MAX_ENTRIES:
+        _LAYOUT_CACHE.popitem(last=False)
+    return layout
+
+
+def layout_opening(upper_txt, judul_txt, subjudul_txt, fonts):
+    """
+    Layout opening (piksel master): teks ter-wrap, font dan posisi y tiap elemen.
+    Ukuran judul dicari yang terbesar agar blok muat di area aman (boleh naik
+    sampai NAIK_MAKS_OPENING dari baseline). Hasil di-cache; jangan diubah.
+    """
+    key = ("opening", upper_txt, judul_txt, subjudul_txt, tuple(sorted(fonts.items())))
+    return _cache_layout(key, lambda: _layout_opening(upper_txt, judul_txt, subjudul_txt, fonts))
+
+
+def _layout_opening(upper_txt, judul_txt, subjudul_txt, fonts):
+    available_width = VIDEO_SIZE[0] - MARGIN_X - MARGIN_KANAN
+    y_start = int(VIDEO_SIZE[1] * BASELINE_FRAC)
+    font_upper = load_font_cached(fonts["upper"], OPENING_FONT_SIZES["upper"]) if upper_txt else None
+    font_sub = load_font_cached(fonts["subjudul"], OPENING_FONT_SIZES["subjudul"]) if subjudul_txt else None
+    wrapped_upper = wrap_paragraf(upper_txt, get_font_metrics(font_upper), available_width) if font_upper else None
+    wrapped_sub = wrap_paragraf(subjudul_txt, get_font_metrics(font_sub), available_width) if font_sub else None
+
+    def tinggi(y, wrapped, font):
+        return bawah_multiline(y, wrapped, get_font_metrics(font))
+
+    def susun(judul_size):
+        font_judul = load_font_cached(fonts["judul"], judul_size) if judul_txt else None
+        wrapped_judul = wrap_paragraf(judul_txt, get_font_metrics(font_judul), available_width) if font_judul else ""
+        current_y = bottom_y = y_start
+        y_upper = y_sub = None
+        if wrapped_upper:
+            y_upper = current_y
+            bottom_y = tinggi(y_upper, wrapped_upper, font_upper)
+            current_y = bottom_y + OPENING_SPACING["upper_judul"]
+        y_judul = current_y
+        tinggi_judul = 0
+        if wrapped_judul:
+            bottom_y = tinggi(y_judul, wrapped_judul, font_judul)
+            tinggi_judul = bottom_y - y_judul
+            current_y = bottom_y + OPENING_SPACING["judul_sub"]
+        if wrapped_sub:
+            y_sub = current_y
+            bottom_y = tinggi(y_sub, wrapped_sub, font_sub)
+        return {
+            "font_upper": font_upper, "font_judul": font_judul, "font_sub": font_sub,
+            "wrapped_upper": wrapped_upper or None, "wrapped_judul": wrapped_judul,
+            "wrapped_sub": wrapped_sub or None, "judul_size": judul_size,
+            "y_upper": y_upper, "y_judul": y_judul, "y_sub": y_sub, "tinggi": bottom_y - y_start,
+            "tinggi_judul": tinggi_judul,
+        }
+
+    ruang = VIDEO_SIZE[1] - MARGIN_BAWAH_LOGO + NAIK_MAKS_OPENING - y_start
+    # Hanya judul yang mengecil: perkiraan dari ruang yang tersisa untuk judul
+    layout = cari_ukuran_font(
+        susun, OPENING_FONT_SIZES["judul"], lambda l: l["tinggi"] <= ruang,
+        tebak=lambda l: tebak_ukuran(l["judul_size"], l["tinggi_judul"], ruang - (l["tinggi"] - l["tinggi_judul"])))
+    offset = y_start - posisi_aman(y_start, layout["tinggi"], NAIK_MAKS_OPENING, PAD_OPENING)
+    for key in ("y_upper", "y_judul", "y_sub"):
+        if layout[key] is not None:
+            layout[key] -= offset
+    layout["bottom_y"] = y_start + layout["tinggi"] - offset
+    return layout
+
+
+def layout_isi(text, font_path, font_size):
+    """
+    Layout blok isi (piksel master): {'font', 'font_size', 'lines', 'base_y'}.
+    Ukuran font terbesar <= font_size yang muat di area aman (boleh naik sampai
+    NAIK_MAKS_ISI dari baseline). Hasil di-cache; jangan diubah.
+    """
+    return _cache_layout(("isi", text, font_path, font_size), lambda: _layout_isi(text, font_path, font_size))
+
+
+def _layout_isi(text, font_path, font_size):
+    y_start = int(VIDEO_SIZE[1] * BASELINE_FRAC)
+    ruang = VIDEO_SIZE[1] - MARGIN_BAWAH_LOGO + NAIK_MAKS_ISI - y_start
+
+    def susun(size):
+        font = load_font_cached(font_path, size) or load_font_cached(font_path, 24)
+        processor = StableTextProcessor(font, VIDEO_SIZE[0])
+        lines = processor.smart_wrap_with_highlights(text)
+        # Tinggi blok dari tinggi baris processor (bbox "HgypqA" + padding), seperti versi awal
+        return {"font": font, "font_size": size, "lines": lines, "tinggi": len(lines) * processor.line_height}
+
+    layout = cari_ukuran_font(susun, font_size, lambda l: l["tinggi"] <= ruang,
+                              tebak=lambda l: tebak_ukuran(l["font_size"], l["tinggi"], ruang))
+    layout["base_y"] = max(80, posisi_aman(y_start, layout["tinggi"], NAIK_MAKS_ISI, PAD_ISI))
+    return layout
+
+
 # ---------- TEXT PROCESSOR DENGAN HIGHLIGHT ----------
 class StableTextProcessor:
-    def __init__(self, font, max_width, margin_x=70, margin_right=90):
+    """
+    Wrap dan layout dalam piksel master (font, max_width, margin); `size` adalah
+    ukuran frame render, posisi dan font diskalakan ke sana saat rasterisasi.
+    """
+
+    def __init__(self, font, max_width, margin_x=MARGIN_X, margin_right=MARGIN_KANAN, size=VIDEO_SIZE,
+                 pix_fmt="rgb24"):
         self.font = font
         self.max_width = max_width
         self.margin_x = margin_x
         self.margin_right = margin_right
+        self.size = tuple(size)
+        self.pix_fmt = pix_fmt
+        self.scale = skala_dari(self.size)
+        self.metrics = get_font_metrics(font)
         self.line_height = self._calculate_line_height()
+        self._layer_cache = None
 
     def _calculate_line_height(self):
         if self.font:
@@ -70,17 +563,10 @@ class StableTextProcessor:
         return 30 + ISILINE_PADDING
 
     def _measure_text(self, text):
-        if not text:
-            return 0
-        if self.font:
-            try:
-                dummy = Image.new("RGBA", (1, 1))
-                d = ImageDraw.Draw(dummy)
-                bbox = d.textbbox((0, 0), text, font=self.font)
-                return max(0, bbox[2] - bbox[0])
-            except:
-                return len(text) * 15
-        return len(text) * 15
+        return self.metrics.width(text)
+
+    def _measure_prefixes(self, word):
+        return self.metrics.prefix_widths(word)
 
     def parse_text_with_highlights(self, text):
         try:
@@ -107,183 +593,607 @@ class StableTextProcessor:
         Membungkus teks sambil menjaga segmen highlight.
         Menghasilkan list of lines; tiap line berisi list dict {word, is_highlight}.
         """
-        segments = self.parse_text_with_highlights(text)
-        available_width = self.max_width - self.margin_x - self.margin_right
-
-        # Orphan words ringan untuk konten
-        orphan_words = {'di', 'ke', 'rp', 'rupiah', 'juta', 'miliar', 'jawa', 'pos', 'ribu'}
-
-        def is_orphan(word):
-            return word.lower().strip('.,!?;:()[]{}"\'-') in orphan_words
-
-        # Flatten ke daftar kata dengan flag highlight
         words = []
-        for seg in segments:
+        for seg in self.parse_text_with_highlights(text):
             for w in seg['text'].split():
                 words.append({'word': w, 'is_highlight': seg['is_highlight']})
+        available_width = self.max_width - self.margin_x - self.margin_right
+        return wrap_kata(words, self.metrics, available_width, orphans=ORPHAN_WORDS)
 
-        lines = []
-        current = []
-        width_acc = 0
-
-        i = 0
-        while i < len(words):
-            w = words[i]
-            w_width = self._measure_text(w['word'] + " ")
+    def layout_block(self, lines, base_y):
+        """
+        Posisi x/y setiap kata dan daftar segmen highlight untuk satu blok.
+        Tidak bergantung pada frame, jadi cukup dihitung sekali per blok.
+        """
+        # Offsets untuk kotak highlight
+        try:
+            bbox_A = self.font.getbbox("A")
+            lh_text = bbox_A[3] - bbox_A[1]
+        except:
+            lh_text = 30
+        line_height = max(lh_text + ISILINE_PADDING, 30 + ISILINE_PADDING)
+
+        # Ukur semua kata untuk posisi x
+        positions_per_line = []
+        y = base_y
+        for line in lines:
+            x = self.margin_x
+            pos_line = []
+            for wi in line:
+                word = wi['word']
+                width_word = self._measure_text(word + " ")
+                pos_line.append((x, wi, width_word))
+                x += width_word
+            positions_per_line.append((y, pos_line))
+            y += line_height
+
+        # Hitung total_chars dari hanya segmen highlight
+        segments = []
+        total_chars = 0
+        for y_line, pos_line in positions_per_line:
+            for (x, wi, width_word) in pos_line:
+                if wi['is_highlight']:
+                    segments.append({
+                        'x': x,
+                        'y': y_line,
+                        'width': width_word,
+                        'word': wi['word'],
+                        'char_start': total_chars,
+                        'char_end': total_chars + len(wi['word'])
+                    })
+                    total_chars += len(wi['word']) + 1  # + spasi
 
-            if width_acc + w_width <= available_width:
-                current.append(w)
-                width_acc += w_width
-                i += 1
-            else:
-                if current:
-                    # Cek orphan terakhir
-                    if len(current) > 1 and is_orphan(current[-1]['word']):
-                        orphan = current.pop()
-                        if current:
-                            lines.append(current)
-                        current = [orphan]  # mulai baris baru dengan orphan
-                        width_acc = self._measure_text(orphan['word'] + " ")
-                    else:
-                        lines.append(current)
-                        current = []
-                        width_acc = 0
-                else:
-                    # Kata lebih panjang dari lebar tersedia — paksa pindah
-                    lines.append([w])
-                    i += 1
-        if current:
-            lines.append(current)
+        return {
+            'positions': positions_per_line,
+            'segments': segments,
+            'total_chars': total_chars,
+            'highlight_top': 3 + 6,
+            'highlight_bottom': line_height - 2 + 6,
+        }
 
-        # Post-fix orphan sederhana antar-baris
-        for j in range(len(lines) - 1):
-            if len(lines[j]) >= 1 and is_orphan(lines[j][-1]['word']):
-                orphan = lines[j].pop()
-                lines[j + 1].insert(0, orphan)
+    def build_block_layers(self, lines, base_y):
+        return BlockLayers(self, lines, base_y)
 
-        return lines
+    def prepare_layers(self, lines, base_y):
+        """BlockLayers untuk (lines, base_y), dibangun sekali lalu dipakai ulang."""
+        cached = self._layer_cache
+        if cached is None or cached[0] is not lines or cached[1] != base_y:
+            cached = (lines, base_y, self.build_block_layers(lines, base_y))
+            self._layer_cache = cached
+        return cached[2]
 
-    def render_lines_with_continuous_highlight(self, lines, base_y, frame_idx, total_frames):
+    def render_lines_with_continuous_highlight(self, lines, base_y, frame_idx, timeline):
         """
         Highlight progresif lintas-baris:
         - Progres global berbasis total karakter highlight
-        - Ease-out global cubic dan intra-kata
-        - Mengukur lebar substring per-frame untuk transisi benar-benar halus
+        - Ease-out global cubic dan intra-kata (lebar prefix substring)
+        State per frame sudah dihitung di `timeline` (HighlightTimeline), jadi per frame
+        hanya lookup + komposit. Layer teks & background dirasterisasi sekali per
+        (lines, base_y); hasilnya buffer yang dipakai ulang antar frame (lihat FramePool).
         """
         try:
-            base_img = Image.new("RGBA", VIDEO_SIZE, BG_COLOR + (255,)) 
-            highlight_layer = Image.new("RGBA", VIDEO_SIZE, (0, 0, 0, 0))
-            text_layer = Image.new("RGBA", VIDEO_SIZE, (0, 0, 0, 0))
-
-            hl_draw = ImageDraw.Draw(highlight_layer)
-            txt_draw = ImageDraw.Draw(text_layer)
-
-            # Progres global highlight (lebih halus = 35% durasi total)
-            span_frames = max(1, int(total_frames * HIGHLIGHT_SPEED_FRAC))
-            base_progress = min(1.0, frame_idx / float(span_frames))
-            global_progress = ease_out_cubic(base_progress)
-
-            # Kumpulkan segmen highlight
-            segments = []
-            total_chars = 0
-            y = base_y
-
-            # Offsets untuk kotak highlight
-            try:
-                bbox_A = self.font.getbbox("A")
-                lh_text = bbox_A[3] - bbox_A[1]
-            except:
-                lh_text = 30
-            line_height = max(lh_text + ISILINE_PADDING, 30 + ISILINE_PADDING)
-            HIGHLIGHT_TOP_OFFSET = 3 + 6
-            HIGHLIGHT_BOTTOM_OFFSET = line_height - 2 + 6
-
-            # Pre-render: ukur semua kata untuk posisi x
-            positions_per_line = []
-            for line in lines:
-                x = self.margin_x
-                pos_line = []
-                for wi in line:
-                    word = wi['word']
-                    width_word = self._measure_text(word + " ")
-                    pos_line.append((x, wi, width_word))
-                    x += width_word
-                positions_per_line.append((y, pos_line))
-                y += line_height
-
-            # Hitung total_chars dari hanya segmen highlight
-            for y_line, pos_line in positions_per_line:
-                for (x, wi, width_word) in pos_line:
-                    if wi['is_highlight']:
-                        segments.append({
-                            'x': x,
-                            'y': y_line,
-                            'width': width_word,
-                            'word': wi['word'],
-                            'char_start': total_chars,
-                            'char_end': total_chars + len(wi['word'])
-                        })
-                        total_chars += len(wi['word']) + 1  # + spasi
-
-            current_chars = int(global_progress * total_chars) if total_chars > 0 else 0
-
-            # Gambar highlight segmen dengan progres halus berbasis lebar substring aktual
-            for seg in segments:
-                if seg['char_start'] > current_chars:
-                    continue
-
-                chars_into = max(0, current_chars - seg['char_start'])
-                word_len = max(1, len(seg['word']))
-                chars_into = min(chars_into, word_len)
-
-                if chars_into >= word_len:
-                    highlight_w = seg['width']
-                else:
-                    # Ukur lebar substring aktual untuk transisi super halus (proporsional huruf)
-                    partial_text = seg['word'][:chars_into]
-                    # smooth intra-kata dengan cubic easing terhadap 1 char berikutnya
-                    intra = 0.0
-                    if chars_into < word_len:
-                        # fraksi menuju karakter berikutnya untuk sedikit interpolasi subpixel
-                        # gunakan sisa progres global kecil untuk smoothing mikro
-                        frac = (global_progress * total_chars - seg['char_start'] - chars_into)
-                        frac = max(0.0, min(1.0, frac))
-                        intra = ease_out_cubic(frac)
-                    partial_plus = partial_text
-                    # Hitung lebar substring
-                    base_w = self._measure_text(partial_plus)
-                    next_char_w = 0
-                    if chars_into < word_len:
-                        next_char_w = self._measure_text(seg['word'][:chars_into+1]) - base_w
-                    highlight_w = base_w + intra * next_char_w
-
-                hl_draw.rectangle(
-                    [
-                        seg['x'] - 4,
-                        seg['y'] + HIGHLIGHT_TOP_OFFSET,
-                        seg['x'] + highlight_w - 4,
-                        seg['y'] + HIGHLIGHT_BOTTOM_OFFSET
-                    ],
-                    fill=HIGHLIGHT_COLOR
-                )
-
-            # Gambar teks di atas highlight (seluruh teks)
-            for y_line, pos_line in positions_per_line:
-                for (x, wi, width_word) in pos_line:
-                    word = wi['word']
-                    if self.font and word:
-                        txt_draw.text((x, y_line), word + " ", font=self.font, fill=TEXT_COLOR)
-
-            # Composite
-            result = Image.alpha_composite(base_img, highlight_layer)
-            result = Image.alpha_composite(result, text_layer)
-            return np.array(result.convert("RGB"))
+            return self.prepare_layers(lines, base_y).render(frame_idx, timeline)
         except Exception as e:
             print(f"⚠️ Render error: {e}")
-            return np.zeros((VIDEO_SIZE[1], VIDEO_SIZE[0], 3), dtype=np.uint8)
-
-
-# ---------- OPENING (LAYOUT MENIRU VERSI AWAL) ----------
+            RENDER_COUNTERS["fallback_frames"] += 1
+            return frame_warna(self.size, (0, 0, 0), self.pix_fmt)
+
+
+# ---------- KOMPOSITOR NUMPY ----------
+def bentuk_frame(size, pix_fmt="rgb24"):
+    """Shape array satu frame: rgb24 -> (H, W, 3); yuv420p -> buffer datar Y + U + V (W*H*3/2)."""
+    w, h = size
+    return (h, w, 3) if pix_fmt == "rgb24" else (w * h * 3 // 2,)
+
+
+def bidang_frame(frame, size, pix_fmt="rgb24"):
+    """View per bidang + faktor subsampling: rgb24 -> [(frame, 1)]; yuv420p -> [(Y, 1), (U, 2), (V, 2)]."""
+    if pix_fmt == "rgb24":
+        return [(frame, 1)]
+    w, h = size
+    n = w * h
+    return [(frame[:n].reshape(h, w), 1),
+            (frame[n:n * 5 // 4].reshape(h // 2, w // 2), 2),
+            (frame[n * 5 // 4:].reshape(h // 2, w // 2), 2)]
+
+
+def slice_bidang(sl, f):
+    """Slice piksel -> slice di bidang bersubsampling f: semua sampel yang tersentuh (slice kosong tetap kosong)."""
+    if f == 1 or sl.start >= sl.stop:
+        return sl
+    return slice(sl.start // f, -(-sl.stop // f))
+
+
+def _rgb_ke_yuv(rgb):
+    """Y, U, V (int32, resolusi penuh) dari RGB uint8: BT.601 limited range, aritmetika integer."""
+    rgb = rgb.astype(np.int32)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    return (((66 * r + 129 * g + 25 * b + 128) >> 8) + 16,
+            ((-38 * r - 74 * g + 112 * b + 128) >> 8) + 128,
+            ((112 * r - 94 * g - 18 * b + 128) >> 8) + 128)
+
+
+def _rata_2x2(plane):
+    """Rata-rata (dibulatkan) tiap blok 2x2: bidang resolusi penuh -> resolusi kroma yuv420p."""
+    h, w = plane.shape
+    return (plane.reshape(h // 2, 2, w // 2, 2).sum(axis=(1, 3)) + 2) >> 2
+
+
+def konversi_frame(rgb, pix_fmt="rgb24", latar=None, bbox=None):
+    """
+    Frame RGB (H, W, 3) ke format render; yuv420p: kroma = rata-rata blok 2x2. Hanya untuk layer
+    statis. Dengan `latar` (warna RGB) dan `bbox` (x0, y0, x1, y1, mis. Image.getbbox() layer teks)
+    frame di luar bbox dianggap berwarna latar, jadi hanya bbox (diperluas ke blok 2x2) yang dikonversi.
+    """
+    if pix_fmt == "rgb24":
+        return rgb
+    h, w = rgb.shape[:2]
+    if latar is None:
+        y, u, v = _rgb_ke_yuv(rgb)
+        return np.concatenate([y.ravel(), _rata_2x2(u).ravel(), _rata_2x2(v).ravel()]).astype(np.uint8)
+    out = frame_warna((w, h), latar, pix_fmt)
+    if bbox is None:
+        return out
+    x0, y0 = bbox[0] // 2 * 2, bbox[1] // 2 * 2
+    x1, y1 = min(w, -(-bbox[2] // 2) * 2), min(h, -(-bbox[3] // 2) * 2)
+    region = konversi_frame(rgb[y0:y1, x0:x1], pix_fmt)
+    planes = zip(bidang_frame(out, (w, h), pix_fmt), bidang_frame(region, (x1 - x0, y1 - y0), pix_fmt))
+    for (dst, f), (src, _) in planes:
+        dst[y0 // f:y1 // f, x0 // f:x1 // f] = src
+    return out
+
+
+def frame_warna(size, color, pix_fmt="rgb24"):
+    """Frame satu warna RGB dalam format render."""
+    if pix_fmt == "rgb24":
+        return np.full((size[1], size[0], 3), color, dtype=np.uint8)
+    frame = np.empty(bentuk_frame(size, pix_fmt), dtype=np.uint8)
+    nilai = konversi_frame(np.full((2, 2, 3), color[:3], dtype=np.uint8), pix_fmt)  # Y x4, U, V
+    for (plane, _), v in zip(bidang_frame(frame, size, pix_fmt), (nilai[0], nilai[4], nilai[5])):
+        plane.fill(v)
+    return frame
+
+
+class KromaPenuh:
+    """
+    Bidang U/V resolusi penuh satu layer statis, untuk blok kroma 2x2 yang pikselnya berasal
+    dari layer berbeda (tepi wipe/kotak highlight di koordinat ganjil): nilainya rata-rata
+    keempat piksel, sama dengan konversi frame RGB. Di luar `bbox` (x0, y0, x1, y1) layer
+    dianggap berwarna `latar`, jadi hanya bbox yang disimpan.
+    """
+
+    def __init__(self, latar, rgb=None, bbox=None):
+        _, u, v = _rgb_ke_yuv(np.array([[latar[:3]]], dtype=np.uint8))
+        self.konst = (int(u[0, 0]), int(v[0, 0]))
+        self.bbox = None
+        self.bidang = ()
+        if bbox is not None:
+            x0, y0, x1, y1 = bbox
+            self.bbox = (y0, y1, x0, x1)
+            _, u, v = _rgb_ke_yuv(rgb[y0:y1, x0:x1])
+            self.bidang = (u.astype(np.uint8), v.astype(np.uint8))
+
+    def ambil(self, k, ys, xs):
+        """Bidang kroma k (0 = U, 1 = V) pada slice piksel (ys, xs), int32."""
+        out = np.full((ys.stop - ys.start, xs.stop - xs.start), self.konst[k], dtype=np.int32)
+        if self.bbox is not None:
+            by0, by1, bx0, bx1 = self.bbox
+            y0, y1 = max(ys.start, by0), min(ys.stop, by1)
+            x0, x1 = max(xs.start, bx0), min(xs.stop, bx1)
+            if y0 < y1 and x0 < x1:
+                out[y0 - ys.start:y1 - ys.start, x0 - xs.start:x1 - xs.start] = \
+                    self.bidang[k][y0 - by0:y1 - by0, x0 - bx0:x1 - bx0]
+        return out
+
+
+def isi_kolom(out, kiri, kanan, c, size, pix_fmt="rgb24", kroma=None):
+    """
+    Kolom < c dari `kiri`, sisanya dari `kanan` (semua bidang; kroma: blok yang tersentuh kolom < c).
+    kroma: (KromaPenuh kiri, KromaPenuh kanan); dengan c ganjil blok kroma di kolom batas
+    menjadi rata-rata piksel kiri dan kanan.
+    """
+    planes = bidang_frame(out, size, pix_fmt)
+    for (dst, f), (a, _), (b, _) in zip(planes, bidang_frame(kiri, size, pix_fmt), bidang_frame(kanan, size, pix_fmt)):
+        cc = -(-c // f)
+        dst[:, :cc] = a[:, :cc]
+        dst[:, cc:] = b[:, cc:]
+    if kroma is not None and c % 2 and 0 < c < size[0]:
+        ys = slice(0, size[1])
+        for k, (dst, _) in enumerate(planes[1:]):
+            full = kroma[0].ambil(k, ys, slice(c - 1, c + 1))
+            full[:, 1:] = kroma[1].ambil(k, ys, slice(c, c + 1))
+            dst[:, c // 2:c // 2 + 1] = _rata_2x2(full)
+    return out
+
+
+class FramePool:
+    """
+    Buffer frame uint8 (bentuk_frame) yang dialokasikan sekali lalu dipakai bergiliran.
+    Frame yang dikembalikan dari pool hanya valid sampai `depth` frame berikutnya;
+    salin jika perlu disimpan lebih lama. Pemanggil tidak boleh mengubah isinya
+    (pemilik pool boleh hanya memperbarui bagian yang berubah).
+    """
+
+    def __init__(self, size=VIDEO_SIZE, depth=FRAME_POOL_DEPTH, pix_fmt="rgb24"):
+        self.buffers = [np.empty(bentuk_frame(size, pix_fmt), dtype=np.uint8) for _ in range(max(1, depth))]
+        self._next = 0
+
+    def acquire(self):
+        buf = self.buffers[self._next]
+        self._next = (self._next + 1) % len(self.buffers)
+        return buf
+
+
+def apply_wipe(out, bg_frame, wipe_w):
+    """Wipe kiri->kanan: kolom 0..wipe_w tetap, sisanya kembali ke background (in-place)."""
+    out[:, wipe_w + 1:] = bg_frame[:, wipe_w + 1:]
+    return out
+
+
+# ---------- TIMELINE ANIMASI ----------
+def lebar_wipe(n_frames, width, wipe_frames, start=0):
+    """Kolom wipe per frame: int(width * ease(prog)) selama wipe, -1 di luar animasi wipe."""
+    i = np.arange(n_frames)
+    active = (i >= start) & (i < start + wipe_frames)
+    prog = (i[active] - start) / float(max(1, wipe_frames))
+    wipe = np.full(n_frames, -1, dtype=np.int64)
+    wipe[active] = (width * ease_out_cubic_array(prog)).astype(np.int64)
+    return wipe
+
+
+class HighlightTimeline:
+    """
+    State animasi satu blok untuk setiap indeks frame, dihitung sekali dengan NumPy:
+    kolom wipe, kotak highlight [x0, y0, x1, y1] (piksel render) dan slice kotak
+    yang sudah dipotong wipe. Frame loop cukup mengindeks; keyframes() mengekspor
+    state yang sama. Tanpa segmen (mis. opening) hanya berisi wipe.
+    """
+
+    def __init__(self, size, wipe, rects=None, visible=None):
+        self.size = tuple(size)
+        self.n_frames = len(wipe)
+        self.wipe = wipe
+        w, h = self.size
+        self.cols = np.where(wipe < 0, w, np.clip(wipe + 1, 0, w))
+        if rects is None:
+            rects = np.zeros((self.n_frames, 0, 4))
+            visible = np.zeros((self.n_frames, 0), dtype=bool)
+        self.rects = rects
+        self.visible = visible
+        # Slice kotak seperti ImageDraw.rectangle (koordinat dipotong ke int, inklusif) lalu dipotong wipe,
+        # untuk semua frame sekaligus
+        r = np.trunc(rects).astype(np.int64)
+        y0, y1 = np.maximum(0, r[..., 1]), np.maximum(0, np.minimum(h, r[..., 3] + 1))
+        x0, x1 = np.maximum(0, r[..., 0]), np.maximum(0, np.minimum(w, r[..., 2] + 1))
+        wiped = (wipe >= 0)[:, None]
+        x1 = np.where(wiped, np.maximum(x0, np.minimum(x1, wipe[:, None] + 1)), x1)
+        self.boxes = np.stack([y0, y1, x0, x1], axis=-1)
+        self._slices = {}
+
+    @classmethod
+    def untuk_blok(cls, block, total_frames, wipe):
+        """Timeline highlight BlockLayers: sweep karakter global + easing intra-kata per segmen."""
+        n = len(wipe)
+        segs = block.segments
+        span_frames = max(1, int(total_frames * HIGHLIGHT_SPEED_FRAC))
+        progress = ease_out_cubic_array(np.minimum(1.0, np.arange(n) / float(span_frames)))
+        total_chars = block.total_chars
+        current = (progress * total_chars).astype(np.int64) if total_chars > 0 else np.zeros(n, dtype=np.int64)
+        if not segs:
+            return cls(block.size, wipe)
+
+        char_start = np.array([seg['char_start'] for seg in segs])
+        word_len = np.array([max(1, len(seg['word'])) for seg in segs])
+        prefixes = [block.processor._measure_prefixes(seg['word']) for seg in segs]
+        table = np.zeros((len(segs), int(word_len.max()) + 2))
+        for k, pw in enumerate(prefixes):
+            table[k, :len(pw)] = pw
+            table[k, len(pw):] = pw[-1]
+
+        chars_into = np.minimum(np.maximum(0, current[:, None] - char_start), word_len)
+        visible = char_start <= current[:, None]
+        partial = visible & (chars_into < word_len)
+        # Lebar sebagian: prefix + easing menuju karakter berikutnya (hanya segmen yang sedang disapu)
+        f, k = np.nonzero(partial)
+        ci = chars_into[f, k]
+        frac = np.clip(progress[f] * total_chars - char_start[k] - ci, 0.0, 1.0)
+        base_w = table[k, ci]
+        width = np.broadcast_to(np.array([seg['width'] for seg in segs], dtype=np.float64), partial.shape).copy()
+        width[f, k] = base_w + ease_out_cubic_array(frac) * (table[k, ci + 1] - base_w)
+
+        x = np.array([seg['x'] for seg in segs], dtype=np.float64)
+        y = np.array([seg['y'] for seg in segs], dtype=np.float64)
+        scale = block.scale
+        rects = np.empty(partial.shape + (4,))
+        rects[..., 0] = (x - 4) * scale
+        rects[..., 1] = (y + block.highlight_top) * scale
+        rects[..., 2] = (x + width - 4) * scale
+        rects[..., 3] = (y + block.highlight_bottom) * scale
+        return cls(block.size, wipe, rects, visible)
+
+    def box_slices(self, i):
+        """Slice (baris, kolom) kotak highlight yang terlihat pada frame i, urut per segmen."""
+        i = min(i, self.n_frames - 1)
+        boxes = self._slices.get(i)
+        if boxes is None:
+            boxes = tuple((slice(y0, y1), slice(x0, x1))
+                          for y0, y1, x0, x1 in self.boxes[i][self.visible[i]].tolist())
+            self._slices[i] = boxes
+        return boxes
+
+    def keyframes(self, fps=FPS):
+        """Frame di mana state berubah: {'frame', 't', 'wipe' (None = penuh), 'highlights' [[x0, y0, x1, y1]]}."""
+        state = np.concatenate([self.wipe[:, None].astype(np.float64),
+                                np.where(self.visible[..., None], self.rects, np.nan).reshape(self.n_frames, -1)],
+                               axis=1)
+        same = np.all((state[1:] == state[:-1]) | (np.isnan(state[1:]) & np.isnan(state[:-1])), axis=1)
+        frames = np.concatenate([[0], np.nonzero(~same)[0] + 1]) if self.n_frames else []
+        out = []
+        for i in frames.tolist():
+            out.append({
+                "frame": i, "t": round(i / float(fps), 4),
+                "wipe": int(self.wipe[i]) if self.wipe[i] >= 0 else None,
+                "highlights": [[round(v, 2) for v in rect] for rect in self.rects[i][self.visible[i]].tolist()],
+            })
+        return out
+
+
+# ---------- LAYER STATIS BLOK ISI ----------
+class BlockLayers:
+    """
+    Layer statis satu blok isi: background dan seluruh teks dirasterisasi sekali.
+    Teks di-composite sekali di atas background dan sekali di atas warna highlight;
+    per frame, area kotak highlight cukup disalin dari versi highlight ke buffer pool.
+    Layout dihitung di piksel master lalu dikali `scale` ke ukuran render. Dengan
+    pix_fmt yuv420p ketiga layer dikonversi sekali dan komposit berjalan per bidang Y/U/V.
+    """
+
+    def __init__(self, processor, lines, base_y):
+        self.processor = processor
+        self.size = processor.size
+        self.scale = processor.scale
+        self.pix_fmt = processor.pix_fmt
+        layout = processor.layout_block(lines, base_y)
+        self.positions = layout['positions']
+        self.segments = layout['segments']
+        self.total_chars = layout['total_chars']
+        self.highlight_top = layout['highlight_top']
+        self.highlight_bottom = layout['highlight_bottom']
+
+        scale = self.scale
+        background = Image.new("RGBA", self.size, BG_COLOR + (255,))
+        text_layer = Image.new("RGBA", self.size, (0, 0, 0, 0))
+        txt_draw = ImageDraw.Draw(text_layer)
+        font = font_skala(processor.font, scale) if processor.font else None
+        for y_line, pos_line in self.positions:
+            for (x, wi, width_word) in pos_line:
+                word = wi['word']
+                if font and word:
+                    txt_draw.text((x * scale, y_line * scale), word + " ", font=font, fill=TEXT_COLOR)
+
+        # alpha_composite per piksel hanya bergantung pada piksel teks dan warna di bawahnya
+        highlight_bg = Image.new("RGBA", self.size, HIGHLIGHT_COLOR)
+        # yuv420p: hanya bbox teks yang dikonversi, sisanya warna latar
+        pix_fmt = self.pix_fmt
+        bbox = text_layer.getchannel("A").getbbox() if pix_fmt != "rgb24" else None
+        on_bg = np.array(Image.alpha_composite(background, text_layer).convert("RGB"))
+        on_hl = np.array(Image.alpha_composite(highlight_bg, text_layer).convert("RGB"))
+        self.bg_frame = konversi_frame(np.array(background.convert("RGB")), pix_fmt, BG_COLOR, None)
+        self.text_on_bg = konversi_frame(on_bg, pix_fmt, BG_COLOR, bbox)
+        self.text_on_hl = konversi_frame(on_hl, pix_fmt, HIGHLIGHT_COLOR, bbox)
+        # yuv420p: kroma resolusi penuh (background, teks di background, teks di highlight) untuk blok tepi
+        self._kroma = None
+        if pix_fmt != "rgb24":
+            self._kroma = (KromaPenuh(BG_COLOR), KromaPenuh(BG_COLOR, on_bg, bbox),
+                           KromaPenuh(HIGHLIGHT_COLOR, on_hl, bbox))
+        # Per bidang: (background, teks di background, teks di highlight, faktor subsampling)
+        self._bidang = [(bg, on_bg, on_hl, f) for (bg, f), (on_bg, _), (on_hl, _) in
+                        zip(*(bidang_frame(x, self.size, pix_fmt) for x in (self.bg_frame, self.text_on_bg,
+                                                                             self.text_on_hl)))]
+        self.pool = FramePool(self.size, pix_fmt=pix_fmt)
+        # Isi terakhir tiap buffer pool (per id buffer): (kotak highlight, wipe_w)
+        self._painted = {}
+
+    def timeline(self, total_frames, wipe):
+        """HighlightTimeline blok ini untuk durasi total_frames dan kolom wipe per frame (lebar_wipe)."""
+        return HighlightTimeline.untuk_blok(self, total_frames, wipe)
+
+    def damage(self, prev, boxes, cols):
+        """
+        Region (slice baris, slice kolom) yang berbeda antara isi buffer `prev`
+        (kotak, kolom terlihat) dan frame baru: kolom yang masuk/keluar wipe, dan bbox
+        gabungan kotak lama+baru untuk setiap kotak highlight yang berubah.
+        """
+        prev_boxes, prev_cols = prev
+        regions = []
+        a, b = sorted((prev_cols, cols))
+        if a < b:
+            regions.append((slice(0, self.size[1]), slice(a, b)))
+        for k in range(max(len(prev_boxes), len(boxes))):
+            old = prev_boxes[k] if k < len(prev_boxes) else None
+            new = boxes[k] if k < len(boxes) else None
+            if old == new:
+                continue
+            parts = [box for box in (old, new)
+                     if box is not None and box[0].start < box[0].stop and box[1].start < box[1].stop]
+            if parts:
+                regions.append((slice(min(p[0].start for p in parts), max(p[0].stop for p in parts)),
+                                slice(min(p[1].start for p in parts), max(p[1].stop for p in parts))))
+        return regions
+
+    def _paint(self, out, ys, xs, boxes, cols):
+        """
+        Komposit ulang satu region: teks (kolom < cols) atau background, lalu kotak highlight di dalamnya.
+        Di bidang kroma aturan yang sama berlaku per blok 2x2 (slice_bidang); blok yang tercampur
+        dihitung ulang oleh _tepi_kroma. Hasil tetap hanya bergantung pada state frame, bukan pada
+        region mana yang dicat.
+        """
+        for (dst, _), (bg, on_bg, on_hl, f) in zip(bidang_frame(out, self.size, self.pix_fmt), self._bidang):
+            pys, pxs = slice_bidang(ys, f), slice_bidang(xs, f)
+            c = min(pxs.stop, max(pxs.start, -(-cols // f)))
+            dst[pys, pxs.start:c] = on_bg[pys, pxs.start:c]
+            dst[pys, c:pxs.stop] = bg[pys, c:pxs.stop]
+            for bys, bxs in boxes:
+                bys, bxs = slice_bidang(bys, f), slice_bidang(bxs, f)
+                y0, y1 = max(pys.start, bys.start), min(pys.stop, bys.stop)
+                x0, x1 = max(pxs.start, bxs.start), min(pxs.stop, bxs.stop)
+                if y0 < y1 and x0 < x1:
+                    dst[y0:y1, x0:x1] = on_hl[y0:y1, x0:x1]
+        if self._kroma is not None:
+            self._tepi_kroma(out, ys, xs, boxes, cols)
+
+    def _tepi_kroma(self, out, ys, xs, boxes, cols):
+        """
+        Blok kroma 2x2 yang dilewati batas wipe atau tepi kotak highlight di koordinat ganjil:
+        komposit ulang keempat pikselnya di resolusi penuh (KromaPenuh) lalu dirata-rata.
+        Blok lain seluruh pikselnya dari satu layer, jadi nilai subsampled layer itu sudah tepat.
+        """
+        pys, pxs = slice_bidang(ys, 2), slice_bidang(xs, 2)
+        strips = []  # (baris blok, kolom blok)
+        if cols % 2:
+            strips.append((pys, slice(cols // 2, cols // 2 + 1)))
+        for bys, bxs in boxes:
+            if bys.start >= bys.stop or bxs.start >= bxs.stop:
+                continue
+            rows, kol = slice_bidang(bys, 2), slice_bidang(bxs, 2)
+            strips += [(rows, slice(x // 2, x // 2 + 1)) for x in (bxs.start, bxs.stop) if x % 2]
+            strips += [(slice(y // 2, y // 2 + 1), kol) for y in (bys.start, bys.stop) if y % 2]
+        planes = bidang_frame(out, self.size, self.pix_fmt)[1:]
+        bg, on_bg, on_hl = self._kroma
+        for rows, kol in strips:
+            r0, r1 = max(rows.start, pys.start), min(rows.stop, pys.stop)
+            c0, c1 = max(kol.start, pxs.start), min(kol.stop, pxs.stop)
+            if r0 >= r1 or c0 >= c1:
+                continue
+            Y, X = slice(2 * r0, 2 * r1), slice(2 * c0, 2 * c1)
+            cut = min(max(cols - X.start, 0), X.stop - X.start)
+            for k, (dst, _) in enumerate(planes):
+                full = on_bg.ambil(k, Y, X)
+                full[:, cut:] = bg.ambil(k, Y, slice(X.start + cut, X.stop))
+                for bys, bxs in boxes:
+                    y0, y1 = max(Y.start, bys.start), min(Y.stop, bys.stop)
+                    x0, x1 = max(X.start, bxs.start), min(X.stop, bxs.stop)
+                    if y0 < y1 and x0 < x1:
+                        full[y0 - Y.start:y1 - Y.start, x0 - X.start:x1 - X.start] = \
+                            on_hl.ambil(k, slice(y0, y1), slice(x0, x1))
+                dst[r0:r1, c0:c1] = _rata_2x2(full)
+
+    def render(self, frame_idx, timeline):
+        """
+        Frame RGB di buffer pool: teks + highlight + wipe sesuai state frame di `timeline`.
+        Buffer pool masih berisi frame lamanya, jadi hanya region yang berubah
+        (tepi kotak highlight yang tumbuh, kolom wipe baru) yang dikomposit ulang;
+        urutan frame bebas, hasil sama dengan render penuh.
+        """
+        out = self.pool.acquire()
+        boxes = timeline.box_slices(frame_idx)
+        cols = int(timeline.cols[min(frame_idx, timeline.n_frames - 1)])
+        # Dilepas dulu: jika gagal di tengah, buffer ini dirender penuh lain kali
+        prev = self._painted.pop(id(out), None)
+        if prev is None:
+            regions = [(slice(0, self.size[1]), slice(0, self.size[0]))]
+        else:
+            regions = self.damage(prev, boxes, cols)
+        for ys, xs in regions:
+            self._paint(out, ys, xs, boxes, cols)
+        self._painted[id(out)] = (boxes, cols)
+        return out
+
+
+# ---------- KLIP DENGAN FRAME HOLD ----------
+def jumlah_frame(dur, fps=FPS):
+    """Jumlah frame yang ditulis encoder untuk durasi ini (setara np.arange(0, dur, 1/fps))."""
+    return int(np.ceil(round(dur * fps, 6)))
+
+
+class HoldAwareClip(VideoClip):
+    """
+    VideoClip berbasis indeks frame yang melaporkan rentang frame statisnya.
+    hold_ranges: list (start, end) setengah-terbuka; di dalam satu rentang output
+    dijamin konstan, jadi frame dirender sekali lalu dikirim ulang ke encoder
+    sebagai frame duplikat.
+    """
+
+    def __init__(self, render_index, duration, hold_ranges=(), size=VIDEO_SIZE, fps=FPS, pix_fmt="rgb24"):
+        self.render_index = render_index
+        self.pix_fmt = pix_fmt  # Format frame dari render_index (bentuk_frame)
+        self.n_frames = jumlah_frame(duration, fps)
+        self.hold_ranges = sorted(
+            (max(0, a), min(b, self.n_frames)) for a, b in hold_ranges if min(b, self.n_frames) > max(0, a)
+        )
+        self._held = {}
+        self.stats = None  # ClipStats jika telemetri aktif
+        self.timeline = None  # HighlightTimeline jika klip beranimasi
+        # Tanpa make_frame di __init__: VideoClip akan merender frame 0 hanya untuk membaca ukuran
+        VideoClip.__init__(self, duration=duration)
+        self.make_frame = lambda t: self.frame(int(t * fps))
+        self.size = tuple(size)
+        self.fps = fps
+
+    def hold_range_of(self, i):
+        for a, b in self.hold_ranges:
+            if a <= i < b:
+                return (a, b)
+        return None
+
+    def _render(self, i):
+        if self.stats is None:
+            return self.render_index(i)
+        t0 = time.perf_counter()
+        frame = self.render_index(i)
+        self.stats.frame_ms.append((time.perf_counter() - t0) * 1000.0)
+        return frame
+
+    def frame(self, i):
+        rng = self.hold_range_of(i)
+        if rng is None:
+            return self._render(i)
+        held = self._held.get(rng)
+        if held is None:
+            # Salin: render_index boleh mengembalikan buffer pool yang nanti ditimpa
+            held = np.array(self._render(i))
+            held.setflags(write=False)
+            self._held[rng] = held
+        elif self.stats is not None:
+            self.stats.held_hits += 1
+        return held
+
+    def frame_runs(self):
+        """Urutan (frame_awal, jumlah) di mana setiap run berisi frame identik."""
+        runs = []
+        i = 0
+        for a, b in self.hold_ranges:
+            runs.extend((j, 1) for j in range(i, a))
+            runs.append((a, b - a))
+            i = b
+        runs.extend((j, 1) for j in range(i, self.n_frames))
+        return runs
+
+    def held_frames(self):
+        return sum(b - a for a, b in self.hold_ranges)
+
+    def with_overlay(self, layer):
+        """Klip baru dengan overlay di-bake; rentang hold (dan statistik) tetap sama."""
+        render_index = self.render_index
+        pool = FramePool(self.size, pix_fmt=self.pix_fmt)
+
+        def render_overlay(i):
+            frame = render_index(i)
+            if baked.stats is None:
+                return layer.apply(frame, out=pool.acquire())
+            t0 = time.perf_counter()
+            out = layer.apply(frame, out=pool.acquire())
+            baked.stats.composite_s += time.perf_counter() - t0
+            return out
+
+        baked = HoldAwareClip(render_overlay, self.duration, self.hold_ranges, size=self.size, fps=self.fps,
+                              pix_fmt=self.pix_fmt)
+        baked.stats = self.stats
+        baked.timeline = self.timeline
+        return baked
+
+
+# ---------- OPENING ----------
 def durasi_judul_awal(upper, judul, subjudul):
     panjang = len((upper or "").split()) + len((judul or "").split()) + len((subjudul or "").split())
     if panjang <= 8: return 2.5
@@ -292,264 +1202,403 @@ def durasi_judul_awal(upper, judul, subjudul):
     return 4.0
 
 
-def render_opening(upper_txt, judul_txt, subjudul_txt, fonts):
+def render_opening(upper_txt, judul_txt, subjudul_txt, fonts, size=VIDEO_SIZE, fps=FPS, pix_fmt="rgb24"):
+    """Layout dihitung di piksel master (VIDEO_SIZE) lalu dirasterisasi pada `size`."""
     dur = durasi_judul_awal(upper_txt, judul_txt, subjudul_txt)
-    total_frames = int(FPS * dur)
-    static_frames = int(FPS * 0.2)
-    fade_frames = int(FPS * 0.8)
-    margin_x = 70
-    margin_bawah_logo = 170
-    batas_bawah_aman = VIDEO_SIZE[1] - margin_bawah_logo
-
-    dummy_img = Image.new("RGBA", (1, 1))
-    draw = ImageDraw.Draw(dummy_img)
-    upper_font_size = 25
-    judul_font_size = 60
-    sub_font_size = 25
-    
-    # PERUBAHAN 2: Penyesuaian jarak vertikal (Upper <-> Judul <-> Subjudul)
-    spacing_upper_judul = 0    # Diubah dari 12 menjadi 8
-    spacing_judul_sub = 16     # Diubah dari 19 menjadi 12
-
-    def smart_wrap(text, font, max_width, margin_left=70, margin_right=90):
-        if not text:
-            return ""
-        paragraphs = text.split("\n")
-        out = []
-        for para in paragraphs:
-            para = para.strip()
-            if not para:
-                out.append("")
-                continue
-            line = ""
-            for word in para.split():
-                test = (line + word + " ")
-                try:
-                    bbox = draw.textbbox((0, 0), test, font=font)
-                    w = bbox[2] - bbox[0]
-                except:
-                    w = len(test) * 15
-                if w + margin_left + margin_right > max_width:
-                    out.append(line.strip())
-                    line = word + " "
-                else:
-                    line = test
-            if line:
-                out.append(line.strip())
-        return "\n".join(out)
-
-    def calculate_layout(current_judul_font_size):
-        font_upper = ImageFont.truetype(fonts["upper"], upper_font_size) if (upper_txt and os.path.exists(fonts["upper"])) else load_font_safe(fonts["upper"], upper_font_size) if upper_txt else None
-        font_judul = ImageFont.truetype(fonts["judul"], current_judul_font_size) if (judul_txt and os.path.exists(fonts["judul"])) else load_font_safe(fonts["judul"], current_judul_font_size) if judul_txt else None
-        font_sub = ImageFont.truetype(fonts["subjudul"], sub_font_size) if (subjudul_txt and os.path.exists(fonts["subjudul"])) else load_font_safe(fonts["subjudul"], sub_font_size) if subjudul_txt else None
-
-        wrapped_upper = smart_wrap(upper_txt, font_upper, VIDEO_SIZE[0]) if font_upper and upper_txt else None
-        wrapped_judul = smart_wrap(judul_txt, font_judul, VIDEO_SIZE[0]) if font_judul and judul_txt else ""
-        wrapped_sub = smart_wrap(subjudul_txt, font_sub, VIDEO_SIZE[0]) if font_sub and subjudul_txt else None
+    total_frames = int(fps * dur)
+    static_frames = int(fps * 0.2)
+    fade_frames = int(fps * 0.8)
+    layout = layout_opening(upper_txt, judul_txt, subjudul_txt, fonts)
+
+    # Teks opening dirasterisasi sekali; per frame hanya wipe kolom di buffer pool.
+    # Sama dengan multiline_text, tapi jarak baris diambil dari font master agar
+    # posisi tiap baris pada resolusi lain tetap hasil skala layout master.
+    scale = skala_dari(size)
+    background = Image.new("RGBA", size, BG_COLOR + (255,))
+    layer = Image.new("RGBA", size, (0, 0, 0, 0))
+    layer_draw = ImageDraw.Draw(layer)
+    for key in ("upper", "judul", "sub"):
+        wrapped, y, font = layout[f"wrapped_{key}"], layout[f"y_{key}"], layout[f"font_{key}"]
+        if not wrapped or y is None:
+            continue
+        line_spacing = get_font_metrics(font).bottom("A") + 4
+        render_font = font_skala(font, scale)
+        for line in wrapped.split("\n"):
+            layer_draw.text((MARGIN_X * scale, y * scale), line, font=render_font, fill=TEXT_COLOR)
+            y += line_spacing
+    bbox = layer.getchannel("A").getbbox() if pix_fmt != "rgb24" else None
+    bg_frame = konversi_frame(np.array(background.convert("RGB")), pix_fmt, BG_COLOR, None)
+    full_rgb = np.array(Image.alpha_composite(background, layer).convert("RGB"))
+    full_frame = konversi_frame(full_rgb, pix_fmt, BG_COLOR, bbox)
+    full_frame.setflags(write=False)
+    kroma = (KromaPenuh(BG_COLOR, full_rgb, bbox), KromaPenuh(BG_COLOR)) if pix_fmt != "rgb24" else None
+    pool = FramePool(size, pix_fmt=pix_fmt)
+    # Fade = wipe kiri->kanan setelah static_frames; di luar itu teks tampil penuh
+    timeline = HighlightTimeline(size, lebar_wipe(jumlah_frame(dur, fps), size[0], fade_frames, start=static_frames))
+    wipe = timeline.wipe.tolist()
+
+    def render_index(i):
+        width = wipe[min(i, len(wipe) - 1)]
+        if width < 0:
+            return full_frame
+        out = pool.acquire()
+        if pix_fmt != "rgb24":
+            return isi_kolom(out, full_frame, bg_frame, width + 1, size, pix_fmt, kroma)
+        c = width + 1
+        out[:, :c] = full_frame[:, :c]
+        return apply_wipe(out, bg_frame, width)
+
+    # Sebelum dan sesudah fade, teks tampil penuh tanpa animasi
+    hold_ranges = [(0, static_frames), (static_frames + fade_frames, jumlah_frame(dur, fps))]
+    clip = HoldAwareClip(render_index, dur, hold_ranges, size=size, fps=fps, pix_fmt=pix_fmt)
+    clip.timeline = timeline
+    return clip
+
+
+# ---------- KONTEN ISI: MULTILINE HIGHLIGHT + WIPE ----------
+def render_text_block(text, font_path, font_size, dur, size=VIDEO_SIZE, fps=FPS, pix_fmt="rgb24"):
+    total_frames = int(fps * dur)
+    wipe_frames = min(int(fps * 0.8), total_frames)  # 0.8s wipe
+
+    # Wrap, ukuran font dan posisi dari layout engine (piksel master, di-cache per teks)
+    layout = layout_isi(text, font_path, font_size)
+    wrapped_lines, base_y = layout["lines"], layout["base_y"]
+    processor = StableTextProcessor(layout["font"], VIDEO_SIZE[0], margin_x=MARGIN_X, margin_right=MARGIN_KANAN,
+                                    size=size, pix_fmt=pix_fmt)
+
+    # Wipe di awal: kolom di kanan wipe kembali ke background (BG_COLOR)
+    wipe = lebar_wipe(jumlah_frame(dur, fps), size[0], wipe_frames)
+    # Rasterisasi layer dan timeline highlight sekarang (bagian dari layout), bukan di frame pertama
+    timeline = None
+    try:
+        timeline = processor.prepare_layers(wrapped_lines, base_y).timeline(total_frames, wipe)
+    except Exception as e:
+        print(f"⚠️ Layer build error: {e}")
 
-        y_start = int(VIDEO_SIZE[1] * 0.60)
-        current_y = y_start
-        y_upper = y_judul = y_sub = None
-        bottom_y = y_start
+    def render_index(i):
+        return processor.render_lines_with_continuous_highlight(wrapped_lines, base_y, i, timeline)
 
-        if wrapped_upper:
-            y_upper = current_y
-            upper_bbox = draw.multiline_textbbox((margin_x, y_upper), wrapped_upper, font=font_upper, spacing=4)
-            current_y = upper_bbox[3] + spacing_upper_judul
-            bottom_y = upper_bbox[3]
+    # Setelah sweep highlight dan wipe selesai, frame tidak berubah lagi
+    span_frames = max(1, int(total_frames * HIGHLIGHT_SPEED_FRAC))
+    hold_ranges = [(max(span_frames, wipe_frames), jumlah_frame(dur, fps))]
+    clip = HoldAwareClip(render_index, dur, hold_ranges, size=size, fps=fps, pix_fmt=pix_fmt)
+    clip.timeline = timeline
+    return clip
 
-        y_judul = current_y
-        if wrapped_judul:
-            judul_bbox = draw.multiline_textbbox((margin_x, y_judul), wrapped_judul, font=font_judul, spacing=4)
-            bottom_y = judul_bbox[3]
-            current_y = judul_bbox[3] + spacing_judul_sub
 
-        if wrapped_sub:
-            y_sub = current_y
-            sub_bbox = draw.multiline_textbbox((margin_x, y_sub), wrapped_sub, font=font_sub, spacing=4)
-            bottom_y = sub_bbox[3]
+# ---------- SEPARATOR / PENUTUP ----------
+def render_separator(dur=0.7, size=VIDEO_SIZE, fps=FPS, pix_fmt="rgb24"):
+    # Frame separator menggunakan BG_COLOR yang baru.
+    frame = frame_warna(size, BG_COLOR, pix_fmt)
+    return HoldAwareClip(lambda i: frame, dur, [(0, jumlah_frame(dur, fps))], size=size, fps=fps, pix_fmt=pix_fmt)
 
-        return {
-            "font_upper": font_upper, "font_judul": font_judul, "font_sub": font_sub,
-            "wrapped_upper": wrapped_upper if wrapped_upper else None,
-            "wrapped_judul": wrapped_judul,
-            "wrapped_sub": wrapped_sub if wrapped_sub else None,
-            "y_upper": y_upper, "y_judul": y_judul, "y_sub": y_sub, "bottom_y": bottom_y
-        }
 
-    layout = calculate_layout(judul_font_size)
-    if layout["bottom_y"] > batas_bawah_aman:
-        layout = calculate_layout(int(judul_font_size * 0.94))
-
-    # Jika masih terlalu rendah, geser ke atas (meniru patch versi awal)
-    if layout["bottom_y"] > batas_bawah_aman:
-        kelebihan = layout["bottom_y"] - batas_bawah_aman
-        offset = min(kelebihan + 20, 150)
-        for key in ["y_upper", "y_judul", "y_sub"]:
-            if layout[key] is not None:
-                layout[key] -= offset
-
-    def make_frame(t):
-        i = int(t * FPS)
-        if i < static_frames:
-            prog = 1.0
-            anim = False
-        elif i < static_frames + fade_frames:
-            prog = (i - static_frames) / float(fade_frames)
-            anim = True
-        else:
-            prog = 1.0
-            anim = False
-
-        frame = Image.new("RGBA", VIDEO_SIZE, BG_COLOR + (255,))
-        layer = Image.new("RGBA", VIDEO_SIZE, (0, 0, 0, 0))
-        if layout["wrapped_upper"] and layout["y_upper"] is not None:
-            ImageDraw.Draw(layer).multiline_text((margin_x, layout["y_upper"]), layout["wrapped_upper"], font=layout["font_upper"], fill=TEXT_COLOR, align="left", spacing=4)
-        if layout["wrapped_judul"] and layout["y_judul"] is not None:
-            ImageDraw.Draw(layer).multiline_text((margin_x, layout["y_judul"]), layout["wrapped_judul"], font=layout["font_judul"], fill=TEXT_COLOR, align="left", spacing=4)
-        if layout["wrapped_sub"] and layout["y_sub"] is not None:
-            ImageDraw.Draw(layer).multiline_text((margin_x, layout["y_sub"]), layout["wrapped_sub"], font=layout["font_sub"], fill=TEXT_COLOR, align="left", spacing=4)
-
-        if anim and prog < 1.0:
-            t_eased = ease_out_cubic(prog)
-            width = int(VIDEO_SIZE[0] * t_eased)
-            mask = Image.new("L", VIDEO_SIZE, 0)
-            ImageDraw.Draw(mask).rectangle([0, 0, width, VIDEO_SIZE[1]], fill=255)
-            visible = Image.composite(layer, Image.new("RGBA", VIDEO_SIZE, (0, 0, 0, 0)), mask)
-        else:
-            visible = layer
-
-        composed = Image.alpha_composite(frame, visible)
-        return np.array(composed.convert("RGB"))
-
-    return VideoClip(make_frame, duration=dur)
-
-
-# ---------- KONTEN ISI: MULTILINE HIGHLIGHT + WIPE (LAYOUT MENIRU AWAL) ----------
-def render_text_block(text, font_path, font_size, dur):
-    total_frames = int(FPS * dur)
-    wipe_frames = min(int(FPS * 0.8), total_frames)  # 0.8s wipe
-    margin_x = 70
-    base_y = int(VIDEO_SIZE[1] * 0.60)
-    margin_bawah_logo = 170
-    batas_bawah_aman = VIDEO_SIZE[1] - margin_bawah_logo
-
-    font = load_font_safe(font_path, font_size)
-    if not font:
-        font = load_font_safe(font_path, 24)
-
-    # Wrap teks isi meniru versi awal (smart_wrap dengan placeholder aman tidak diperlukan di sini,
-    # karena processor sudah memelihara highlight via tokenisasi)
-    processor = StableTextProcessor(font, VIDEO_SIZE[0], margin_x=margin_x, margin_right=90)
-    wrapped_lines = processor.smart_wrap_with_highlights(text)
-
-    # Hitung tinggi total seperti versi awal (pakai line height + ISILINE_PADDING-2 untuk bbox)
-    total_h = len(wrapped_lines) * processor.line_height
-    # Batas bawah aman
-    bottom_y = base_y + total_h
-    if bottom_y > batas_bawah_aman:
-        overflow = bottom_y - batas_bawah_aman
-        base_y = max(80, base_y - min(overflow + 40, 250))
-
-    def make_frame(t):
-        i = int(t * FPS)
-        # Render dasar (highlight + text)
-        base_frame = processor.render_lines_with_continuous_highlight(wrapped_lines, base_y, i, total_frames)
-
-        # Terapkan wipe di awal
-        if i < wipe_frames:
-            prog = i / float(max(1, wipe_frames))
-            t_eased = ease_out_cubic(prog)
-            wipe_w = int(VIDEO_SIZE[0] * t_eased)
-
-            frame_img = Image.fromarray(base_frame)
-            mask = Image.new("L", VIDEO_SIZE, 0)
-            ImageDraw.Draw(mask).rectangle([0, 0, wipe_w, VIDEO_SIZE[1]], fill=255)
-
-            # Transisi wipe menggunakan BG_COLOR yang baru.
-            colored_bg = Image.new("RGB", VIDEO_SIZE, BG_COLOR) 
-            frame = Image.composite(frame_img, colored_bg, mask)
-            return np.array(frame)
+# ---------- OVERLAY ----------
+class OverlayLayer:
+    """
+    Overlay RGBA yang sudah premultiplied (uint8) + alpha terbalik.
+    Blend integer: out = premul + frame * (255 - a) / 255, hanya di bbox piksel
+    yang tidak transparan. Blend ini linier, jadi untuk pix_fmt yuv420p warna overlay
+    dikonversi sekali ke Y/U/V dan blend dijalankan per bidang (kroma: alpha dan
+    warna premultiplied dirata-rata per blok 2x2).
+    """
+
+    def __init__(self, rgba, pix_fmt="rgb24"):
+        self.pix_fmt = pix_fmt
+        self.size = (rgba.shape[1], rgba.shape[0])
+        alpha = rgba[:, :, 3].astype(np.uint16)
+        if pix_fmt == "rgb24":
+            premul = ((rgba[:, :, :3].astype(np.uint16) * alpha[:, :, None] + 127) // 255).astype(np.uint8)
+            planes = [(premul, (255 - alpha)[:, :, None], alpha)]
         else:
-            return base_frame
+            a32 = alpha.astype(np.int32)
+            y, u, v = _rgb_ke_yuv(rgba[:, :, :3])
+            a_kroma = _rata_2x2(a32)
+            planes = [(((y * a32 + 127) // 255).astype(np.uint8), 255 - alpha, alpha)]
+            planes += [(((_rata_2x2(c * a32) + 127) // 255).astype(np.uint8), (255 - a_kroma).astype(np.uint16),
+                        a_kroma) for c in (u, v)]
+        # Per bidang: (premul, alpha terbalik, bbox piksel tidak transparan, scratch uint16)
+        self.planes = []
+        for premul, inv_alpha, a in planes:
+            ys, xs = np.nonzero(a)
+            if not len(ys):
+                self.planes.append((premul, inv_alpha, None, None))
+                continue
+            bbox = (int(ys.min()), int(ys.max()) + 1, int(xs.min()), int(xs.max()) + 1)
+            y0, y1, x0, x1 = bbox
+            scratch = np.empty((y1 - y0, x1 - x0) + premul.shape[2:], dtype=np.uint16)
+            self.planes.append((premul, inv_alpha, bbox, scratch))
+        self.bbox = self.planes[0][2]
+
+    def apply(self, frame, out=None):
+        """Blend overlay ke frame; dengan `out` hasil ditulis ke buffer itu tanpa alokasi besar."""
+        if self.bbox is None:
+            if out is None:
+                return frame
+            np.copyto(out, frame)
+            return out
+        if out is None:
+            out = frame.copy()
+        elif out is not frame:
+            np.copyto(out, frame)
+        src_planes = bidang_frame(frame, self.size, self.pix_fmt)
+        out_planes = bidang_frame(out, self.size, self.pix_fmt)
+        for (src, _), (dst, _), (premul, inv_alpha, bbox, scratch) in zip(src_planes, out_planes, self.planes):
+            if bbox is None:
+                continue
+            y0, y1, x0, x1 = bbox
+            np.multiply(src[y0:y1, x0:x1], inv_alpha[y0:y1, x0:x1], out=scratch)
+            scratch += 127
+            scratch //= 255
+            scratch += premul[y0:y1, x0:x1]
+            dst[y0:y1, x0:x1] = scratch
+        return out
 
-    return VideoClip(make_frame, duration=dur)
 
+_OVERLAY_CACHE = {}
 
-# ---------- SEPARATOR / PENUTUP ----------
-def render_separator(dur=0.7):
-    # Frame separator menggunakan BG_COLOR yang baru.
-    frame = np.full((VIDEO_SIZE[1], VIDEO_SIZE[0], 3), BG_COLOR, dtype=np.uint8) 
-    return ImageClip(frame, duration=dur)
 
+def _asset_cache_key(path, size):
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_mtime_ns, tuple(size))
 
-# ---------- OVERLAY ----------
-def add_overlay(base_clip):
-    if not os.path.exists(OVERLAY_FILE):
-        print(f"⚠️ Overlay file {OVERLAY_FILE} not found, skipping overlay")
-        return base_clip
+
+def load_overlay_rgba(path=None, size=None):
+    """Overlay RGBA (H, W, 4) seukuran `size` (default VIDEO_SIZE), atau None jika tidak tersedia."""
+    path = path or OVERLAY_FILE
+    size = size or VIDEO_SIZE
+    if not os.path.exists(path):
+        print(f"⚠️ Overlay file {path} not found, skipping overlay")
+        return None
     try:
-        img = Image.open(OVERLAY_FILE).convert("RGBA").resize(VIDEO_SIZE, Image.LANCZOS)
-        overlay = ImageClip(np.array(img), duration=base_clip.duration)
-        return CompositeVideoClip([base_clip, overlay.set_pos((0, 0))], size=VIDEO_SIZE)
+        key = _asset_cache_key(path, size)
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+        cache_file = os.path.join(ASSET_CACHE_DIR, f"overlay_{digest}.npy")
+        if os.path.exists(cache_file):
+            try:
+                return np.load(cache_file)
+            except Exception as e:
+                print(f"⚠️ Asset cache unreadable ({e}), resizing again")
+        img = Image.open(path).convert("RGBA").resize(size, Image.LANCZOS)
+        rgba = np.array(img)
+        try:
+            os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+            tmp = cache_file + f".{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, rgba)
+            os.replace(tmp, cache_file)
+        except OSError as e:
+            print(f"⚠️ Could not write asset cache: {e}")
+        return rgba
     except Exception as e:
         print(f"❌ Failed to apply overlay: {e}")
-        return base_clip
+        return None
 
 
-# ---------- PARSER DATA STABIL ----------
-def baca_semua_berita_stable(filename):
+def load_overlay_layer(path=None, size=None, pix_fmt="rgb24"):
+    """
+    OverlayLayer dari cache memori (kunci: path, mtime, ukuran target, pix_fmt).
+    File yang tidak ada juga di-cache (per path), jadi peringatan hanya muncul sekali per proses.
+    """
+    path = path or OVERLAY_FILE
+    size = size or VIDEO_SIZE
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            content = f.read()
+        key = _asset_cache_key(path, size) + (pix_fmt,)
+    except OSError:
+        key = ("hilang", os.path.abspath(path))  # file muncul kemudian -> kunci stat, dimuat normal
+    if key in _OVERLAY_CACHE:
+        return _OVERLAY_CACHE[key]
+    rgba = load_overlay_rgba(path, size)
+    layer = OverlayLayer(rgba, pix_fmt) if rgba is not None else None
+    _OVERLAY_CACHE[key] = layer
+    return layer
+
+
+def overlay_timeline(timeline, layer):
+    """Bake overlay ke tiap klip timeline; frame hold di-overlay sekali saja."""
+    if layer is None:
+        return timeline
+    baked = {}
+    out = []
+    for clip in timeline:
+        if id(clip) not in baked:
+            baked[id(clip)] = clip.with_overlay(layer)
+        out.append(baked[id(clip)])
+    return out
 
-        all_data = []
-        current = {}
-        isi_counter = 1
-        state = None
 
-        for raw in content.split('\n'):
-            line = raw.strip()
-            if not line:
-                continue
-            if line.lower().startswith('upper:'):
-                if current and (any(k.startswith('Isi_') for k in current.keys()) or 'Judul' in current or 'Subjudul' in current):
-                    all_data.append(current)
-                current = {}
-                isi_counter = 1
-                state = 'upper'
-                current['Upper'] = line.split(':', 1)[1].strip()
-            elif line.lower().startswith('judul:'):
-                state = 'judul'
-                current['Judul'] = line.split(':', 1)[1].strip()
-            elif line.lower().startswith('subjudul:'):
-                state = 'subjudul'
-                current['Subjudul'] = line.split(':', 1)[1].strip()
-            else:
-                if state == 'upper':
-                    current['Upper'] = (current.get('Upper', '') + ('\n' if current.get('Upper') else '') + line).strip()
-                elif state == 'judul':
-                    if len(line) > 100 or '[[' in line:
-                        state = 'isi'
-                        current[f'Isi_{isi_counter}'] = line
-                        isi_counter += 1
-                    else:
-                        current['Judul'] = (current.get('Judul', '') + ('\n' if current.get('Judul') else '') + line).strip()
-                elif state == 'subjudul':
-                    if len(line) > 100 or '[[' in line:
-                        state = 'isi'
-                        current[f'Isi_{isi_counter}'] = line
-                        isi_counter += 1
-                    else:
-                        current['Subjudul'] = (current.get('Subjudul', '') + ('\n' if current.get('Subjudul') else '') + line).strip()
+# ---------- PARSER DATA STABIL ----------
+def _artikel_lengkap(current, allow_upper_only=False):
+    return bool(current) and (any(k.startswith('Isi_') for k in current.keys()) or 'Judul' in current
+                              or 'Subjudul' in current or (allow_upper_only and 'Upper' in current))
+
+
+def _iter_txt(f):
+    """
+    Parser streaming format Upper:/Judul:/Subjudul:/Isi (data_berita.txt).
+    Menghasilkan (artikel, error, nomor_baris); artikel dikirim begitu baris
+    Upper: berikutnya terbaca, jadi memori tidak tumbuh dengan ukuran file.
+    """
+    current = {}
+    isi_counter = 1
+    state = None
+    error = None
+    start_line = 1
+
+    for lineno, raw_bytes in enumerate(f, 1):
+        try:
+            raw = raw_bytes.decode('utf-8-sig')  # -sig: BOM di awal file (Notepad/Excel)
+        except UnicodeDecodeError as e:
+            # Artikel ini rusak; lewati sampai Upper: berikutnya
+            error = error or f"line {lineno}: {e}"
+            raw = raw_bytes.decode('utf-8-sig', 'replace')
+        line = raw.strip()
+        if not line:
+            continue
+        if line.lower().startswith('upper:'):
+            if error:
+                yield None, error, start_line
+            elif _artikel_lengkap(current):
+                yield current, None, start_line
+            current = {}
+            error = None
+            start_line = lineno
+            isi_counter = 1
+            state = 'upper'
+            current['Upper'] = line.split(':', 1)[1].strip()
+        elif line.lower().startswith('judul:'):
+            state = 'judul'
+            current['Judul'] = line.split(':', 1)[1].strip()
+        elif line.lower().startswith('subjudul:'):
+            state = 'subjudul'
+            current['Subjudul'] = line.split(':', 1)[1].strip()
+        else:
+            if state == 'upper':
+                current['Upper'] = (current.get('Upper', '') + ('\n' if current.get('Upper') else '') + line).strip()
+            elif state == 'judul':
+                if len(line) > 100 or '[[' in line:
+                    state = 'isi'
+                    current[f'Isi_{isi_counter}'] = line
+                    isi_counter += 1
                 else:
+                    current['Judul'] = (current.get('Judul', '') + ('\n' if current.get('Judul') else '') + line).strip()
+            elif state == 'subjudul':
+                if len(line) > 100 or '[[' in line:
                     state = 'isi'
                     current[f'Isi_{isi_counter}'] = line
                     isi_counter += 1
+                else:
+                    current['Subjudul'] = (current.get('Subjudul', '') + ('\n' if current.get('Subjudul') else '') + line).strip()
+            else:
+                state = 'isi'
+                current[f'Isi_{isi_counter}'] = line
+                isi_counter += 1
+
+    if error:
+        yield None, error, start_line
+    elif _artikel_lengkap(current, allow_upper_only=True):
+        yield current, None, start_line
+
+
+def normalisasi_artikel(obj):
+    """
+    Objek bulk (JSONL/CSV) -> dict Upper/Judul/Subjudul/Isi_N.
+    Menerima kunci huruf besar/kecil, 'isi' berupa list/string (paragraf dipisah baris kosong)
+    atau kolom isi_1..isi_N.
+    """
+    if not isinstance(obj, dict):
+        raise ValueError(f"expected an object, got {type(obj).__name__}")
+    data = {}
+    isi = []
+    numbered = []
+    for key, value in obj.items():
+        if value is None or key is None:
+            continue
+        k = key.strip().lower()
+        if k in ('upper', 'judul', 'subjudul'):
+            text = str(value).strip()
+            if text:
+                data[k.capitalize()] = text
+        elif k == 'isi':
+            if isinstance(value, list):
+                isi.extend(str(v).strip() for v in value)
+            else:
+                isi.extend(p.strip() for p in re.split(r'\n\s*\n', str(value)))
+        elif re.fullmatch(r'isi_\d+', k):
+            numbered.append((int(k.split('_')[1]), str(value).strip()))
+    isi.extend(v for _, v in sorted(numbered))
+    for n, teks in enumerate([t for t in isi if t], 1):
+        data[f'Isi_{n}'] = teks
+    if not _artikel_lengkap(data, allow_upper_only=True):
+        raise ValueError("article has no Upper/Judul/Subjudul/Isi content")
+    return data
+
+
+def _iter_jsonl(f):
+    for lineno, raw in enumerate(f, 1):
+        line = raw.strip()
+        if not line:
+            continue
+        try:
+            yield normalisasi_artikel(json.loads(line)), None, lineno
+        except Exception as e:
+            yield None, f"line {lineno}: {e}", lineno
+
+
+def _iter_csv(f):
+    reader = csv.DictReader(f)
+    for row in reader:
+        try:
+            yield normalisasi_artikel(row), None, reader.line_num
+        except Exception as e:
+            yield None, f"line {reader.line_num}: {e}", reader.line_num
+
+
+def deteksi_format(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    if ext == '.csv':
+        return 'csv'
+    return 'txt'
+
+
+def iter_berita(filename, fmt=None, shard=None, on_error=None):
+    """
+    Generator (indeks, artikel) yang membaca input secara streaming.
+    fmt: 'txt' | 'jsonl' | 'csv' (default dari ekstensi file).
+    shard: (start, end) rentang indeks artikel [start, end); end None = sampai habis.
+    on_error: callback dict {index, line, error} untuk artikel yang gagal di-parse;
+    artikel gagal tetap memakai satu indeks agar penomoran output stabil antar run/shard.
+    """
+    fmt = fmt or deteksi_format(filename)
+    start, end = shard if shard else (0, None)
+    if fmt == 'txt':
+        f = open(filename, 'rb')
+        rows = _iter_txt(f)
+    else:
+        f = open(filename, 'r', encoding='utf-8-sig', errors='replace', newline='')
+        rows = _iter_jsonl(f) if fmt == 'jsonl' else _iter_csv(f)
+    try:
+        for index, (data, error, lineno) in enumerate(rows):
+            if end is not None and index >= end:
+                break
+            if index < start:
+                continue
+            if error:
+                if on_error:
+                    on_error({"index": index, "line": lineno, "error": error})
+                else:
+                    print(f"⚠️ Skipping article #{index + 1} ({error})")
+                continue
+            yield index, data
+    finally:
+        f.close()
 
-        if current and (any(k.startswith('Isi_') for k in current.keys()) or 'Judul' in current or 'Subjudul' in current or 'Upper' in current):
-            all_data.append(current)
 
+def baca_semua_berita_stable(filename):
+    try:
+        all_data = [data for _, data in iter_berita(filename)]
         print(f"📊 Parsed {len(all_data)} data entries")
         return all_data
     except Exception as e:
@@ -576,62 +1625,1860 @@ def hitung_durasi_isi(text):
         return 5.0
 
 
-# ---------- PIPELINE ----------
-def buat_video_stable(data, i=None):
+# ---------- PROFIL ENCODER ----------
+def profil_encoder(name=None):
+    """Dict profil dari ENCODER_PROFILES (default ENCODER_PROFILE)."""
+    name = name or ENCODER_PROFILE
+    if name not in ENCODER_PROFILES:
+        raise ValueError(f"unknown encoder profile {name!r} (choose from {', '.join(ENCODER_PROFILES)})")
+    return ENCODER_PROFILES[name]
+
+
+def pix_fmt_render(pix_fmt=None, profile=None, size=VIDEO_SIZE, engine="pipe"):
+    """
+    Format piksel render yang dipakai (default RENDER_PIX_FMT). yuv420p hanya jika encode
+    output juga yuv420p, ukuran genap dan frame ditulis writer ffmpeg (bukan moviepy);
+    selain itu kembali ke rgb24.
+    """
+    pix_fmt = pix_fmt or RENDER_PIX_FMT
+    if pix_fmt not in ("rgb24", "yuv420p"):
+        raise ValueError(f"unknown render pix_fmt {pix_fmt!r} (rgb24 or yuv420p)")
+    if pix_fmt == "yuv420p":
+        out_fmt = profil_encoder(profile).get("pix_fmt") or "yuv420p"
+        if out_fmt != "yuv420p" or size[0] % 2 or size[1] % 2 or engine == "moviepy":
+            print(f"ℹ️ yuv420p render needs the ffmpeg writer and a yuv420p encode at even size "
+                  f"(engine {engine}, {out_fmt}, {size[0]}x{size[1]}): rendering rgb24")
+            return "rgb24"
+    return pix_fmt
+
+
+def ffmpeg_params_profil(profile, fps=FPS):
+    """Argumen -tune/-crf/-g untuk profil; preset, thread dan pix_fmt diatur writer."""
+    params = []
+    if profile.get("tune"):
+        params.extend(["-tune", profile["tune"]])
+    if profile.get("crf") is not None:
+        params.extend(["-crf", str(profile["crf"])])
+    if profile.get("gop_s"):
+        params.extend(["-g", str(max(1, int(round(profile["gop_s"] * fps))))])
+    if profile.get("maxrate_k"):
+        params.extend(["-maxrate", f"{profile['maxrate_k']}k", "-bufsize", f"{2 * profile['maxrate_k']}k"])
+    return params
+
+
+def argumen_encode(codec, profile, size, fps=FPS, threads=4):
+    """Argumen output ffmpeg untuk satu file: codec, preset, parameter profil, thread, pix_fmt."""
+    profile = profil_encoder(profile) if not isinstance(profile, dict) else profile
+    args = ["-vcodec", codec, "-preset", profile["preset"]]
+    args.extend(ffmpeg_params_profil(profile, fps))
+    args.extend(["-threads", str(threads)])
+    if codec == "libx264" and size[0] % 2 == 0 and size[1] % 2 == 0:
+        args.extend(["-pix_fmt", profile.get("pix_fmt") or "yuv420p"])
+    return args
+
+
+def filter_skala(src, dst):
+    """Filter ffmpeg dari frame master `src` ke `dst` (area); rasio berbeda -> fit + pad BG_COLOR di tengah."""
+    w, h = dst
+    if tuple(src) == tuple(dst):
+        return "null"
+    if src[0] * h == src[1] * w:
+        return f"scale={w}:{h}:flags=area"
+    color = "0x%02x%02x%02x" % tuple(BG_COLOR)
+    return (f"scale={w}:{h}:force_original_aspect_ratio=decrease:flags=area,"
+            f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2:color={color}")
+
+
+def rencana_varian(names):
+    """Nama varian -> list (nama, ukuran, profil) terurut dari yang terbesar; yang pertama jadi master."""
+    unknown = [n for n in names if n not in OUTPUT_VARIANTS]
+    if unknown or not names:
+        raise ValueError(f"unknown variant(s) {unknown or names!r} (choose from {', '.join(OUTPUT_VARIANTS)})")
+    plan = [(n, tuple(OUTPUT_VARIANTS[n]["size"]), OUTPUT_VARIANTS[n]["encoder"]) for n in dict.fromkeys(names)]
+    for _, _, profile in plan:
+        profil_encoder(profile)
+    return sorted(plan, key=lambda v: v[1][0] * v[1][1], reverse=True)
+
+
+def jumlah_cpu():
+    """Core yang boleh dipakai proses ini (menghormati affinity/cgroup cpuset)."""
     try:
-        print(f"\n🎬 STARTING VIDEO {i+1 if i is not None else 1}")
-        print("=" * 60)
-        print(f"📝 Title: {data.get('Judul', 'No Title')}")
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def thread_encoder(concurrent=1):
+    """Thread ffmpeg per encode: core dibagi rata ke encode yang berjalan bersamaan."""
+    return max(1, jumlah_cpu() // max(1, concurrent))
+
+
+# ---------- OUTPUT LANGSUNG KE FFMPEG ----------
+class FfmpegPipeWriter:
+    """
+    Menulis frame RGB mentah langsung ke stdin ffmpeg (parameter encode dari profil
+    encoder, sama dengan write_videofile moviepy). Buffer numpy dikirim apa adanya
+    tanpa salinan per frame.
+    variants: output tambahan (filename, ukuran, profil) dari stream yang sama; ffmpeg
+    memecah stream (split), men-downscale tiap varian (filter_skala) dan meng-encode
+    semua output bersamaan. input_pix_fmt: format frame yang ditulis (rgb24 atau yuv420p).
+    """
+
+    def __init__(self, filename, size=VIDEO_SIZE, fps=FPS, codec="libx264", profile=None, threads=4, variants=(),
+                 input_pix_fmt="rgb24"):
+        self.filename = filename
+        cmd = [
+            get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-vcodec", "rawvideo",
+            "-s", "%dx%d" % (size[0], size[1]),
+            "-pix_fmt", input_pix_fmt,
+            "-r", "%.02f" % fps,
+            "-an", "-i", "-",
+        ]
+        outputs = [(filename, tuple(size), profile)] + [(f, tuple(s), p) for f, s, p in variants]
+        if len(outputs) > 1:
+            # Semua output yuv420p: konversi warna sekali di ukuran master, scale di bidang YUV
+            pix_fmts = {(profil_encoder(p) if not isinstance(p, dict) else p).get("pix_fmt") or "yuv420p"
+                        for _, _, p in outputs}
+            head = "format=yuv420p," if codec == "libx264" and pix_fmts == {"yuv420p"} else ""
+            graph = [f"[0:v]{head}split={len(outputs)}" + "".join(f"[s{k}]" for k in range(len(outputs)))]
+            graph += [f"[s{k}]{filter_skala(size, out_size)}[o{k}]" for k, (_, out_size, _) in enumerate(outputs)]
+            cmd.extend(["-filter_complex", ";".join(graph)])
+        for k, (out_name, out_size, out_profile) in enumerate(outputs):
+            if len(outputs) > 1:
+                cmd.extend(["-map", f"[o{k}]"])
+            cmd.extend(argumen_encode(codec, out_profile, out_size, fps, threads))
+            cmd.append(out_name)
+        self._stderr = tempfile.TemporaryFile()
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr)
+        self.frames_written = 0
+
+    def write(self, frame, repeat=1):
+        buf = np.ascontiguousarray(frame, dtype=np.uint8)
+        try:
+            for _ in range(repeat):
+                self.proc.stdin.write(buf)
+        except (BrokenPipeError, OSError) as e:
+            raise IOError(f"ffmpeg stopped accepting frames for {self.filename}: {self._error_text() or e}")
+        self.frames_written += repeat
 
-        opening = render_opening(
-            data.get("Upper", ""), 
-            data.get("Judul", ""), 
-            data.get("Subjudul", ""), 
-            FONTS
-        )
+    def _error_text(self):
+        self._stderr.seek(0)
+        return self._stderr.read().decode("utf-8", "replace").strip()
 
-        isi_keys = sorted([k for k in data.keys() if k.startswith("Isi_")], key=lambda x: int(x.split('_')[-1]))
-        clips = []
-        sep = render_separator(0.7)
+    def close(self):
+        try:
+            if self.proc.stdin and not self.proc.stdin.closed:
+                self.proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        code = self.proc.wait()
+        err = self._error_text()
+        self._stderr.close()
+        if code != 0:
+            raise IOError(f"ffmpeg exited with code {code} for {self.filename}: {err}")
+
+
+# ---------- TELEMETRI ----------
+# Penghitung global per proses; telemetri membaca selisihnya per video
+RENDER_COUNTERS = {"fallback_frames": 0}
+
+
+def _percentiles(values):
+    if not values:
+        return None
+    arr = np.asarray(values)
+    p50, p90, p99 = np.percentile(arr, [50, 90, 99])
+    return {"p50": round(float(p50), 3), "p90": round(float(p90), 3),
+            "p99": round(float(p99), 3), "max": round(float(arr.max()), 3)}
+
+
+def _peak_rss_mb(who="self"):
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who == "self" else resource.RUSAGE_CHILDREN)
+    return round(usage.ru_maxrss / 1024.0, 1)  # Linux: KB
+
+
+class ClipStats:
+    """
+    Statistik satu klip timeline: waktu layout, waktu render per frame, frame hold.
+    occurrences: berapa kali klip (mis. separator bersama) muncul di timeline; frame dan hold
+    di-encode di setiap kemunculan.
+    """
+
+    def __init__(self, name, clip):
+        self.name = name
+        self.n_frames = clip.n_frames
+        self.held_frames = clip.held_frames()
+        self.occurrences = 0
+        self.layout_s = 0.0
+        self.composite_s = 0.0
+        self.frame_ms = []
+        self.held_hits = 0
+
+    def report(self):
+        return {
+            "clip": self.name,
+            "frames": self.n_frames,
+            "held_frames": self.held_frames,
+            "occurrences": self.occurrences,
+            "rendered": len(self.frame_ms),
+            "layout_s": round(self.layout_s, 4),
+            "render_s": round(sum(self.frame_ms) / 1000.0, 4),
+            "composite_s": round(self.composite_s, 4),
+            "frame_ms": _percentiles(self.frame_ms),
+        }
 
-        if isi_keys:
-            for idx, k in enumerate(isi_keys, 1):
-                teks = data[k]
-                dur = hitung_durasi_isi(teks)
-                print(f"   {k}: {len(teks)} chars → {dur}s")
-                clips.append(render_text_block(teks, FONTS["isi"], 34, dur))
-                if idx < len(isi_keys):
-                    clips.append(sep)
-        else:
-            clips.append(render_text_block("Konten tidak tersedia", FONTS["isi"], 34, 3.0))
 
-        ending = render_separator(3.0)
-        final = concatenate_videoclips([opening, sep] + clips + [ending], method="compose")
-        result = add_overlay(final)
+class RenderTelemetry:
+    """
+    Metrik terstruktur satu video: waktu per tahap, persentil waktu frame,
+    frame dirender vs hold, jumlah frame fallback (hitam), peak RSS.
+    Opsional: cProfile (profile_dir) dan tracemalloc per video.
+    """
+
+    def __init__(self, label, metrics_path=None, profile_dir=None, trace_memory=False):
+        self.label = label
+        self.metrics_path = metrics_path
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.clips = []
+        self.info = {}
+        self._profiler = None
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - t0
+
+    def track_clip(self, name, clip):
+        """Dipanggil untuk setiap kemunculan klip di timeline."""
+        if clip.stats is None:
+            clip.stats = ClipStats(name, clip)
+            self.clips.append(clip.stats)
+        clip.stats.occurrences += 1
+        return clip.stats
+
+    def start(self):
+        self._fallback_start = RENDER_COUNTERS["fallback_frames"]
+        self._t0 = time.perf_counter()
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        if self.profile_dir:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def finish(self, **info):
+        if self._profiler is not None:
+            self._profiler.disable()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            prof_path = os.path.join(self.profile_dir, os.path.basename(self.label) + ".prof")
+            self._profiler.dump_stats(prof_path)
+            info["profile"] = prof_path
+        self.info.update(info)
+
+        clips = [c.report() for c in self.clips]
+        frame_ms = [ms for c in self.clips for ms in c.frame_ms]
+        render_s = sum(frame_ms) / 1000.0
+        composite_s = sum(c.composite_s for c in self.clips)
+        stages = {f"{k}_s": round(v, 4) for k, v in self.stages.items()}
+        stages["render_s"] = round(render_s - composite_s, 4)
+        stages["composite_s"] = round(composite_s, 4)
+        if "write" in self.stages and "encode" not in self.stages:
+            # moviepy merender + encode di satu loop; encode = sisa waktu di luar render
+            stages["encode_s"] = round(max(0.0, self.stages["write"] - render_s), 4)
+        report = {
+            "type": "video",
+            "label": self.label,
+            "wall_s": round(time.perf_counter() - self._t0, 4),
+            "stages": stages,
+            "frames": {
+                "total": sum(c.n_frames * c.occurrences for c in self.clips),
+                "rendered": len(frame_ms),
+                "held": sum(c.held_frames * c.occurrences for c in self.clips),
+            },
+            "frame_ms": _percentiles(frame_ms),
+            "fallback_frames": RENDER_COUNTERS["fallback_frames"] - self._fallback_start,
+            "peak_rss_mb": _peak_rss_mb("self"),
+            "peak_rss_children_mb": _peak_rss_mb("children"),
+        }
+        if self.trace_memory and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            report["tracemalloc_peak_mb"] = round(peak / 1024.0 / 1024.0, 2)
+            top = tracemalloc.take_snapshot().statistics("lineno")[:10]
+            report["tracemalloc_top"] = [{"where": str(st.traceback), "kb": round(st.size / 1024.0, 1)} for st in top]
+        report.update(self.info)
+        report["clips"] = clips
+
+        if self.metrics_path:
+            with open(self.metrics_path, "a", encoding="utf-8") as f:
+                for c in clips:
+                    f.write(json.dumps(dict(c, type="clip", label=self.label)) + "\n")
+                f.write(json.dumps({k: v for k, v in report.items() if k != "clips"}) + "\n")
+        return report
 
-        fname = f"output_video_multiline_v2_{(i or 0)+1}.mp4"
-        print(f"🎥 Encoding: {fname}")
+
+# ---------- PIPELINE ----------
+def rencana_segmen(data, verbose=False, size=VIDEO_SIZE, fps=FPS, penutup=True, pix_fmt="rgb24"):
+    """
+    Rencana timeline satu artikel sebagai spesifikasi segmen yang bisa di-pickle:
+    opening, isi + separator, penutup (penutup=False: tanpa penutup, mis. di tengah buletin).
+    Setiap spec punya 'jenis', 'durasi' serta ukuran render ('size') dan 'fps'
+    (+ 'pix_fmt' jika bukan rgb24, jadi kunci cache rgb24 tidak berubah).
+    """
+    render = {"size": tuple(size), "fps": fps}
+    if pix_fmt != "rgb24":
+        render["pix_fmt"] = pix_fmt
+    upper, judul, subjudul = data.get("Upper", ""), data.get("Judul", ""), data.get("Subjudul", "")
+    specs = [dict(render, jenis="opening", upper=upper, judul=judul, subjudul=subjudul,
+                  durasi=durasi_judul_awal(upper, judul, subjudul))]
+    sep = dict(render, jenis="separator", durasi=0.7)
+    specs.append(sep)
+
+    isi_keys = sorted([k for k in data.keys() if k.startswith("Isi_")], key=lambda x: int(x.split('_')[-1]))
+    if isi_keys:
+        for idx, k in enumerate(isi_keys, 1):
+            teks = data[k]
+            dur = hitung_durasi_isi(teks)
+            if verbose:
+                print(f"   {k}: {len(teks)} chars → {dur}s")
+            specs.append(dict(render, jenis="isi", teks=teks, font=FONTS["isi"], font_size=ISI_FONT_SIZE,
+                              durasi=dur))
+            if idx < len(isi_keys):
+                specs.append(sep)
+    else:
+        specs.append(dict(render, jenis="isi", teks="Konten tidak tersedia", font=FONTS["isi"],
+                          font_size=ISI_FONT_SIZE, durasi=3.0))
+
+    if penutup:
+        specs.append(dict(render, jenis="separator", durasi=3.0))
+    return specs
+
+
+def bangun_klip(spec):
+    size, fps, pix_fmt = spec.get("size", VIDEO_SIZE), spec.get("fps", FPS), spec.get("pix_fmt", "rgb24")
+    if spec["jenis"] == "opening":
+        return render_opening(spec["upper"], spec["judul"], spec["subjudul"], FONTS, size=size, fps=fps,
+                              pix_fmt=pix_fmt)
+    if spec["jenis"] == "isi":
+        return render_text_block(spec["teks"], spec["font"], spec["font_size"], spec["durasi"], size=size, fps=fps,
+                                 pix_fmt=pix_fmt)
+    return render_separator(spec["durasi"], size=size, fps=fps, pix_fmt=pix_fmt)
+
+
+def spec_key(spec):
+    return tuple(sorted(spec.items()))
+
+
+def nama_klip(spec, idx):
+    if spec["jenis"] == "isi":
+        return f"isi_{idx}"
+    if spec["jenis"] == "separator":
+        return "separator" if spec["durasi"] < 3.0 else "penutup"
+    return spec["jenis"]
+
+
+def susun_timeline(specs, telemetry=None):
+    """Daftar klip berurutan dari rencana segmen; spec yang sama memakai klip yang sama."""
+    built = {}
+    timeline = []
+    n_isi = 0
+    for spec in specs:
+        if spec["jenis"] == "isi":
+            n_isi += 1
+        key = spec_key(spec)
+        t0 = time.perf_counter()
+        baru = key not in built
+        if baru:
+            built[key] = bangun_klip(spec)
+        if telemetry is not None:
+            stats = telemetry.track_clip(nama_klip(spec, n_isi), built[key])
+            if baru:
+                stats.layout_s = time.perf_counter() - t0
+        timeline.append(built[key])
+    return timeline
+
+
+def keyframes_artikel(data, size=VIDEO_SIZE, fps=FPS):
+    """
+    Keyframe animasi satu artikel tanpa merender frame: per klip timeline, frame awal
+    global dan HighlightTimeline.keyframes() (klip tanpa animasi: list kosong).
+    """
+    specs = rencana_segmen(data, size=size, fps=fps)
+    clips = []
+    start = 0
+    n_isi = 0
+    for spec, clip in zip(specs, susun_timeline(specs)):
+        n_isi += spec["jenis"] == "isi"
+        clips.append({"clip": nama_klip(spec, n_isi), "start_frame": start, "frames": clip.n_frames,
+                      "keyframes": clip.timeline.keyframes(fps) if clip.timeline is not None else []})
+        start += clip.n_frames
+    return {"judul": data.get("Judul", ""), "size": list(size), "fps": fps, "frames": start, "clips": clips}
+
+
+# ---------- FRAME TUNGGAL ----------
+def frame_spec(spec):
+    """Jumlah frame satu spec segmen (sama dengan n_frames klipnya), tanpa membangun klip."""
+    return jumlah_frame(spec["durasi"], spec.get("fps", FPS))
+
+
+def cari_frame(specs, frame_idx):
+    """Indeks frame global -> (indeks spec, indeks frame lokal); negatif dihitung dari akhir, lewat akhir -> frame terakhir."""
+    counts = [frame_spec(spec) for spec in specs]
+    if frame_idx < 0:
+        frame_idx += sum(counts)
+    start = 0
+    for k, n in enumerate(counts):
+        if frame_idx < start + n:
+            return k, max(0, frame_idx - start)
+        start += n
+    return len(specs) - 1, counts[-1] - 1
+
+
+def render_frame_spec(spec, local_idx, overlay=True):
+    """Salinan frame RGB ke-`local_idx` dari satu spec: hanya klip spec ini yang di-layout dan dirender."""
+    clip = bangun_klip(spec)
+    frame = np.array(clip.render_index(min(local_idx, clip.n_frames - 1)))
+    layer = load_overlay_layer(size=clip.size) if overlay else None
+    return layer.apply(frame, out=frame) if layer is not None else frame
+
+
+def render_frame(data, frame=None, t=None, size=VIDEO_SIZE, fps=FPS, overlay=True):
+    """
+    Satu frame artikel (array RGB HxWx3) pada indeks `frame` atau detik `t` (int(t * fps),
+    sama dengan klip), tanpa menyusun timeline atau meng-encode. Tanpa keduanya: frame poster.
+    """
+    specs = rencana_segmen(data, size=size, fps=fps)
+    if frame is None and t is None:
+        return render_frame_spec(specs[0], frame_spec(specs[0]) - 1, overlay)
+    k, local = cari_frame(specs, frame if frame is not None else int(t * fps))
+    return render_frame_spec(specs[k], local, overlay)
+
+
+def frame_poster(data, size=VIDEO_SIZE, fps=FPS, overlay=True):
+    """Frame sampul: frame terakhir opening (upper, judul, subjudul tampil penuh)."""
+    return render_frame(data, size=size, fps=fps, overlay=overlay)
+
+
+def contact_sheet(data, scale=CONTACT_SHEET_SCALE, kolom=CONTACT_SHEET_KOLOM, fps=FPS, overlay=True):
+    """
+    Lembar kontak (PIL Image): frame terakhir opening dan tiap blok Isi_N, dirender langsung
+    di ukuran thumbnail (layout master sama dengan video), `kolom` thumbnail per baris.
+    """
+    size = ukuran_skala(scale)
+    specs = [spec for spec in rencana_segmen(data, size=size, fps=fps) if spec["jenis"] != "separator"]
+    thumbs = [render_frame_spec(spec, frame_spec(spec) - 1, overlay) for spec in specs]
+    kolom = max(1, min(kolom, len(thumbs)))
+    baris = -(-len(thumbs) // kolom)
+    gap = CONTACT_SHEET_GAP
+    sheet = Image.new("RGB", (kolom * (size[0] + gap) + gap, baris * (size[1] + gap) + gap), (0, 0, 0))
+    for n, thumb in enumerate(thumbs):
+        r, c = divmod(n, kolom)
+        sheet.paste(Image.fromarray(thumb), (gap + c * (size[0] + gap), gap + r * (size[1] + gap)))
+    return sheet
+
+
+def nama_per_artikel(path, i, output_dir=None):
+    """FILE.png -> FILE_<n>.png (n = indeks artikel + 1), di output_dir jika ada."""
+    stem, ext = os.path.splitext(path)
+    path = f"{stem}_{i + 1}{ext or '.png'}"
+    return os.path.join(output_dir, path) if output_dir else path
+
+
+def tulis_video_moviepy(timeline, fname, threads=4, telemetry=None, profile=None):
+    size, fps = timeline[0].size, timeline[0].fps
+    profile = profil_encoder(profile)
+    if profile.get("pix_fmt", "yuv420p") != "yuv420p":
+        # write_videofile selalu menambahkan -pix_fmt yuv420p di akhir perintah
+        print(f"⚠️ moviepy engine always writes yuv420p (profile asks for {profile['pix_fmt']}); use --engine pipe")
+    result = concatenate_videoclips(overlay_timeline(timeline, load_overlay_layer(size=size)), method="compose")
+    with telemetry.stage("write") if telemetry else _no_stage():
         result.write_videofile(
             fname,
-            fps=FPS,
+            fps=fps,
             codec="libx264",
             audio=False,
-            preset="medium",
+            preset=profile["preset"],
+            ffmpeg_params=ffmpeg_params_profil(profile, fps),
             logger=None,
-            threads=4
+            threads=threads
         )
+
+
+@contextmanager
+def _no_stage():
+    yield
+
+
+def tulis_video_pipe(timeline, fname, threads=4, telemetry=None, profile=None, variants=()):
+    """
+    Jalan sendiri di sepanjang timeline: tiap klip dirender per indeks frame lokal
+    dan run frame identik (hold) cukup dirender + di-overlay sekali.
+    Ukuran dan FPS output mengikuti klip (semua klip timeline harus sama).
+    variants: output tambahan (filename, ukuran, profil) dari frame yang sama (FfmpegPipeWriter).
+    """
+    size, fps = timeline[0].size, timeline[0].fps
+    writer = FfmpegPipeWriter(fname, size, fps, codec="libx264", profile=profile, threads=threads,
+                              variants=variants, input_pix_fmt=timeline[0].pix_fmt)
+    encode_s = 0.0
+    try:
+        encode_s += tulis_timeline(writer, timeline)
+    finally:
+        t0 = time.perf_counter()
+        writer.close()
+        encode_s += time.perf_counter() - t0
+        if telemetry is not None:
+            telemetry.stages["encode"] = telemetry.stages.get("encode", 0.0) + encode_s
+
+
+# ---------- RENDER FRAME PARALEL ----------
+def run_timeline(timeline):
+    """Unit render timeline: (indeks klip, frame awal, jumlah frame identik) berurutan."""
+    return [(ci, start, count) for ci, clip in enumerate(timeline) for start, count in clip.frame_runs()]
+
+
+def _frame_worker(specs, shm_name, depth, tasks, done):
+    """
+    Proses render frame: bangun timeline sendiri dari spec, lalu untuk tiap chunk
+    (unit awal, unit akhir) render frame ke slot ring unit % depth dan lapor ke `done`.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = None
+    try:
+        timeline = susun_timeline(specs)
+        size, pix_fmt = timeline[0].size, timeline[0].pix_fmt
+        timeline = overlay_timeline(timeline, load_overlay_layer(size=size, pix_fmt=pix_fmt))
+        units = run_timeline(timeline)
+        ring = np.ndarray((depth,) + bentuk_frame(size, pix_fmt), dtype=np.uint8, buffer=shm.buf)
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            fallback0 = RENDER_COUNTERS["fallback_frames"]
+            times = []
+            for k in range(*task):
+                ci, start, _ = units[k]
+                t0 = time.perf_counter()
+                ring[k % depth] = timeline[ci].render_index(start)
+                times.append((time.perf_counter() - t0) * 1000.0)
+            done.put((task[0], times, RENDER_COUNTERS["fallback_frames"] - fallback0))
+    except Exception:
+        done.put(("error", traceback.format_exc(), 0))
+    finally:
+        del ring
+        shm.close()
+
+
+def tulis_video_paralel(specs, timeline, fname, frame_workers=2, depth=FRAME_RING_DEPTH, chunk=FRAME_CHUNK,
+                        threads=4, telemetry=None, profile=None, variants=()):
+    """
+    Seperti tulis_video_pipe, tapi frame dirender `frame_workers` proses (tulis_frame_paralel).
+    `timeline` (dari susun_timeline(specs)) dipakai untuk urutan unit dan telemetri.
+    """
+    size, fps = timeline[0].size, timeline[0].fps
+    writer = FfmpegPipeWriter(fname, size, fps, codec="libx264", profile=profile, threads=threads,
+                              variants=variants, input_pix_fmt=timeline[0].pix_fmt)
+    encode_s = wait_s = 0.0
+    try:
+        encode_s, wait_s = tulis_frame_paralel(writer, specs, timeline, frame_workers, depth, chunk, telemetry)
+    finally:
+        t0 = time.perf_counter()
+        writer.close()
+        encode_s += time.perf_counter() - t0
+        if telemetry is not None:
+            telemetry.stages["encode"] = telemetry.stages.get("encode", 0.0) + encode_s
+            telemetry.stages["frame_wait"] = telemetry.stages.get("frame_wait", 0.0) + wait_s
+
+
+def tulis_frame_paralel(writer, specs, timeline, frame_workers=2, depth=FRAME_RING_DEPTH, chunk=FRAME_CHUNK,
+                        telemetry=None):
+    """
+    Frame dirender `frame_workers` proses ke ring shared_memory berisi `depth` slot
+    frame; proses ini hanya menulis slot ke writer sesuai urutan. Unit (run hold dihitung
+    sekali) dibagi per `chunk` berurutan agar repaint damage di tiap worker tetap efektif.
+    Backpressure: chunk baru dikirim hanya jika semua slotnya sudah ditulis ke encoder,
+    jadi memori tetap depth x ukuran frame. Mengembalikan (detik encode, detik menunggu frame).
+    """
+    size = timeline[0].size
+    units = run_timeline(timeline)
+    chunk = max(1, chunk)
+    depth = max(depth, chunk)
+    chunks = [(a, min(a + chunk, len(units))) for a in range(0, len(units), chunk)]
+    shape = bentuk_frame(size, timeline[0].pix_fmt)
+    shm = shared_memory.SharedMemory(create=True, size=depth * int(np.prod(shape)))
+    ring = np.ndarray((depth,) + shape, dtype=np.uint8, buffer=shm.buf)
+    ctx = multiprocessing.get_context()
+    tasks, done = ctx.Queue(), ctx.Queue()
+    procs = [ctx.Process(target=_frame_worker, args=(specs, shm.name, depth, tasks, done), daemon=True)
+             for _ in range(max(1, min(frame_workers, len(chunks))))]
+    encode_s = wait_s = 0.0
+    try:
+        for proc in procs:
+            proc.start()
+        ready = set()
+        sent = 0
+        for a, b in chunks:
+            while sent < len(chunks) and chunks[sent][1] <= a + depth:
+                tasks.put(chunks[sent])
+                sent += 1
+            t0 = time.perf_counter()
+            while a not in ready:
+                try:
+                    key, times, fallback = done.get(timeout=1.0)
+                except queue.Empty:
+                    if not all(proc.is_alive() for proc in procs):
+                        raise RuntimeError("frame worker died")
+                    continue
+                if key == "error":
+                    raise RuntimeError(f"frame worker failed:\n{times}")
+                ready.add(key)
+                RENDER_COUNTERS["fallback_frames"] += fallback
+                if telemetry is not None:
+                    for k, ms in zip(range(key, key + len(times)), times):
+                        stats = timeline[units[k][0]].stats
+                        if stats is not None:
+                            stats.frame_ms.append(ms)
+            wait_s += time.perf_counter() - t0
+            t0 = time.perf_counter()
+            for k in range(a, b):
+                writer.write(ring[k % depth], repeat=units[k][2])
+            encode_s += time.perf_counter() - t0
+    finally:
+        for _ in procs:
+            tasks.put(None)
+        for proc in procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        del ring
+        shm.close()
+        shm.unlink()
+    return encode_s, wait_s
+
+
+def tulis_timeline(writer, timeline):
+    """Tulis timeline (overlay di-bake di sini) ke writer yang sudah terbuka; mengembalikan detik encode."""
+    timeline = overlay_timeline(timeline, load_overlay_layer(size=timeline[0].size, pix_fmt=timeline[0].pix_fmt))
+    encode_s = 0.0
+    for clip in timeline:
+        for start, count in clip.frame_runs():
+            frame = clip.frame(start)
+            t0 = time.perf_counter()
+            writer.write(frame, repeat=count)
+            encode_s += time.perf_counter() - t0
+    return encode_s
+
+
+def _render_segment_job(job):
+    spec, path, threads, profile = job
+    clip = bangun_klip(spec)
+    tulis_video_pipe([clip], path, threads=threads, profile=profile)
+    return path
+
+
+def concat_segmen(paths, fname):
+    """Gabungkan segmen ber-parameter encode identik dengan concat demuxer (tanpa re-encode)."""
+    list_file = fname + ".concat.txt"
+    with open(list_file, "w", encoding="utf-8") as f:
+        for path in paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    try:
+        cmd = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+               "-f", "concat", "-safe", "0", "-i", list_file, "-c", "copy", fname]
+        proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if proc.returncode != 0:
+            raise IOError(f"ffmpeg concat failed for {fname}: {proc.stderr.decode('utf-8', 'replace').strip()}")
+    finally:
+        os.remove(list_file)
+
+
+# ---------- CACHE SEGMEN ----------
+_FILE_HASH_CACHE = {}
+
+
+def file_digest(path):
+    """SHA-1 isi file (di-cache per path + mtime); file yang tidak ada -> 'missing'."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return "missing"
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    if key not in _FILE_HASH_CACHE:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        _FILE_HASH_CACHE[key] = h.hexdigest()
+    return _FILE_HASH_CACHE[key]
+
+
+def render_payload(spec):
+    """Semua yang menentukan piksel frame satu spec: spec, font (isi file), layout master, warna, highlight, overlay."""
+    if spec["jenis"] == "opening":
+        font_files = [FONTS["upper"], FONTS["judul"], FONTS["subjudul"]]
+    elif spec["jenis"] == "isi":
+        font_files = [spec["font"]]
+    else:
+        font_files = []
+    return {
+        "spec": spec_key(spec),
+        "fonts": [file_digest(f) for f in font_files],
+        "video_size": VIDEO_SIZE,
+        "layout": (MARGIN_X, MARGIN_KANAN, MARGIN_BAWAH_LOGO, BASELINE_FRAC),
+        "colors": (BG_COLOR, TEXT_COLOR, HIGHLIGHT_COLOR),
+        "highlight": (ISILINE_PADDING, HIGHLIGHT_SPEED_FRAC),
+        "overlay": file_digest(OVERLAY_FILE),
+    }
+
+
+def segment_cache_key(spec, codec="libx264", profile=None):
+    """Hash render_payload(spec) + parameter encoder + versi renderer."""
+    payload = render_payload(spec)
+    payload["encoder"] = (codec, sorted(profil_encoder(profile).items()))
+    payload["renderer"] = RENDERER_VERSION
+    return hashlib.sha256(repr(payload).encode("utf-8")).hexdigest()
+
+
+def evict_segment_cache(cache_dir, max_bytes, suffix=".mp4"):
+    """
+    Hapus file `suffix` yang paling lama tidak dipakai (mtime) sampai total <= max_bytes.
+    File sementara (<nama>.tmp-<pid><suffix> atau <nama><suffix>.tmp-<pid>) milik proses yang
+    sudah mati (SIGKILL/OOM) dihapus; yang masih ditulis ikut dihitung tapi tidak dihapus.
+    """
+    entries = []
+    total = 0
+    for name in os.listdir(cache_dir):
+        m = re.search(r"\.tmp-(\d+)", name)
+        if not (name.endswith(suffix) or (m and suffix + ".tmp-" in name)):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if m:
+            pid = int(m.group(1))
+            if pid != os.getpid() and not proses_hidup(pid):
+                print(f"🧹 Removing stale temp file: {name} ({st.st_size / 1e6:.0f} MB)")
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            else:
+                total += st.st_size
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    total += sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def _render_cached_segment_job(job):
+    spec, final_path, threads, profile = job
+    tmp_path = final_path[:-len(".mp4")] + f".tmp-{os.getpid()}.mp4"
+    try:
+        _render_segment_job((spec, tmp_path, threads, profile))
+        os.replace(tmp_path, final_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return final_path
+
+
+def tulis_video_segmen(specs, fname, workers=1, threads=4, cache_dir=None, profile=None):
+    """
+    Opening, tiap paragraf isi, separator dan penutup di-encode sebagai segmen terpisah
+    (paralel di beberapa worker, overlay di-bake per segmen), lalu digabung stream-copy.
+    Segmen dengan spec identik (mis. separator) cukup di-encode sekali.
+    Dengan cache_dir, segmen yang kuncinya sudah ada dipakai ulang tanpa render.
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="vigen_seg_", dir=os.path.dirname(os.path.abspath(fname)))
+    try:
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        unique = {}
+        for spec in specs:
+            key = spec_key(spec)
+            if key not in unique:
+                if cache_dir:
+                    path = os.path.join(cache_dir, segment_cache_key(spec, profile=profile) + ".mp4")
+                else:
+                    path = os.path.join(tmp_dir, f"seg_{len(unique):03d}.mp4")
+                unique[key] = (spec, path)
+
+        jobs = []
+        hits = 0
+        for spec, path in unique.values():
+            if cache_dir and os.path.exists(path):
+                os.utime(path)  # tandai baru dipakai (LRU)
+                hits += 1
+            else:
+                jobs.append((spec, path, threads, profile))
+        if cache_dir:
+            print(f"🗄️ Segment cache: {hits} hit, {len(jobs)} to render")
+        # Segmen terpanjang dulu
+        jobs.sort(key=lambda job: job[0]["durasi"], reverse=True)
+        job_fn = _render_cached_segment_job if cache_dir else _render_segment_job
+
+        if workers <= 1:
+            for job in jobs:
+                job_fn(job)
+        elif jobs:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_warmup_worker) as pool:
+                list(pool.map(job_fn, jobs))
+
+        concat_segmen([unique[spec_key(spec)][1] for spec in specs], fname)
+        if cache_dir:
+            evict_segment_cache(cache_dir, SEGMENT_CACHE_MAX_BYTES)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# ---------- SPOOL FRAME MENTAH ----------
+class FrameSpool:
+    """
+    File spool frame RGB mentah (.vgraw) yang dibaca lewat mmap tanpa salinan.
+    Susunan: MAGIC + panjang header (uint32) + header JSON (size, fps, pix_fmt, units,
+    frames, offset), lalu run length int32 per unit, lalu data frame (units,) + bentuk_frame
+    mulai di offset rata FRAME_SPOOL_ALIGN. Setiap unit = satu run frame identik (hold),
+    jadi frame hold hanya disimpan sekali.
+    """
+
+    MAGIC = b"VGRAW01\n"
+
+    def __init__(self, path, mode="r"):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(self.MAGIC)) != self.MAGIC:
+                raise ValueError(f"{path} is not a frame spool")
+            n = int.from_bytes(f.read(4), "little")
+            self.header = json.loads(f.read(n).decode("utf-8"))
+        h = self.header
+        self.size, self.fps, self.pix_fmt = tuple(h["size"]), h["fps"], h.get("pix_fmt", "rgb24")
+        self.runs = np.memmap(path, dtype=np.int32, mode=mode, offset=h["runs_offset"], shape=(h["units"],))
+        self.frames = np.memmap(path, dtype=np.uint8, mode=mode, offset=h["data_offset"],
+                                shape=(h["units"],) + bentuk_frame(self.size, self.pix_fmt))
+
+    @classmethod
+    def create(cls, path, size, fps, runs, meta=None, pix_fmt="rgb24"):
+        """Spool kosong (sparse) untuk run length `runs`; frame diisi lewat .frames[k] lalu flush()."""
+        runs = np.asarray(runs, dtype=np.int32)
+        header = dict(meta or {}, size=list(size), fps=fps, pix_fmt=pix_fmt, units=len(runs),
+                      frames=int(runs.sum()), created=time.time())
+        # Offset bergantung panjang header; cadangkan 64 byte untuk angka offset itu sendiri
+        base = len(cls.MAGIC) + 4 + len(json.dumps(header).encode("utf-8")) + 64
+        header["runs_offset"] = -(-base // FRAME_SPOOL_ALIGN) * FRAME_SPOOL_ALIGN
+        header["data_offset"] = -(-(header["runs_offset"] + runs.nbytes) // FRAME_SPOOL_ALIGN) * FRAME_SPOOL_ALIGN
+        raw = json.dumps(header).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(cls.MAGIC + len(raw).to_bytes(4, "little") + raw)
+            f.seek(header["runs_offset"])
+            f.write(runs.tobytes())
+            f.truncate(header["data_offset"] + len(runs) * int(np.prod(bentuk_frame(size, pix_fmt))))
+        return cls(path, mode="r+")
+
+    def iter_runs(self):
+        """(frame, jumlah ulang) berurutan; frame adalah view mmap (tanpa salinan)."""
+        for k in range(len(self.runs)):
+            yield self.frames[k], int(self.runs[k])
+
+    def flush(self):
+        self.frames.flush()
+
+    def close(self):
+        # memmap ditutup saat referensi terakhir dilepas
+        self.runs = self.frames = None
+
+
+def frame_spool_path(spool_dir, specs):
+    """Path spool untuk rencana segmen: hash render_payload semua spec + versi renderer."""
+    payload = [render_payload(spec) for spec in specs] + [RENDERER_VERSION]
+    return os.path.join(spool_dir, hashlib.sha256(repr(payload).encode("utf-8")).hexdigest()[:32] + ".vgraw")
+
+
+def tulis_spool_frame(timeline, path, meta=None):
+    """
+    Render timeline (overlay di-bake) ke spool di `path`: satu frame per run (run_timeline).
+    Ditulis ke file sementara lalu os.replace, jadi spool di `path` selalu lengkap.
+    """
+    size, fps, pix_fmt = timeline[0].size, timeline[0].fps, timeline[0].pix_fmt
+    timeline = overlay_timeline(timeline, load_overlay_layer(size=size, pix_fmt=pix_fmt))
+    units = run_timeline(timeline)
+    tmp_path = path + f".tmp-{os.getpid()}"
+    try:
+        spool = FrameSpool.create(tmp_path, size, fps, [count for _, _, count in units], meta, pix_fmt)
+        for k, (ci, start, _) in enumerate(units):
+            spool.frames[k] = timeline[ci].frame(start)
+        spool.flush()
+        spool.close()
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def encode_spool(path, fname, threads=4, profile=None, variants=(), telemetry=None):
+    """Encode spool ke `fname` (container dari ekstensi) tanpa render ulang; frame dikirim langsung dari mmap."""
+    spool = FrameSpool(path)
+    writer = FfmpegPipeWriter(fname, spool.size, spool.fps, codec="libx264", profile=profile, threads=threads,
+                              variants=variants, input_pix_fmt=spool.pix_fmt)
+    t0 = time.perf_counter()
+    try:
+        for frame, count in spool.iter_runs():
+            writer.write(frame, repeat=count)
+    finally:
+        spool.close()
+        writer.close()
+        if telemetry is not None:
+            telemetry.stages["encode"] = telemetry.stages.get("encode", 0.0) + time.perf_counter() - t0
+    return fname
+
+
+def nama_sementara(path):
+    """Nama file sementara di folder yang sama (ekstensi dipertahankan agar ffmpeg tahu formatnya)."""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.tmp-{os.getpid()}{ext}"
+
+
+def hapus_sementara_basi(path):
+    """Hapus file sementara output yang sama milik proses yang sudah mati (SIGKILL/OOM tidak sempat bersih-bersih)."""
+    folder = os.path.dirname(path) or "."
+    stem, ext = os.path.splitext(os.path.basename(path))
+    pola = re.compile(re.escape(stem) + r"\.tmp-(\d+)" + re.escape(ext) + "$")
+    for name in os.listdir(folder) if os.path.isdir(folder) else ():
+        m = pola.match(name)
+        if not m or int(m.group(1)) == os.getpid():
+            continue
+        if proses_hidup(int(m.group(1))):
+            continue
+        print(f"🧹 Removing stale partial output: {name}")
+        os.remove(os.path.join(folder, name))
+
+
+def buat_video_stable(data, i=None, engine=None, threads=None, workers=1, cache_dir=None, telemetry_opts=None,
+                      draft=False, encoder=None, output_dir=None, frame_workers=1, ring_depth=FRAME_RING_DEPTH,
+                      variants=None, frame_spool=None, spool_keep=FRAME_SPOOL_KEEP, pix_fmt=None):
+    """
+    Render satu artikel; hasilnya dict status (ok/error, output, durasi proses).
+    telemetry_opts: dict opsional {"metrics_path", "profile_dir", "trace_memory"}.
+    draft: pratinjau DRAFT_SCALE/DRAFT_FPS ke file *_draft.mp4 (layout sama).
+    encoder: nama profil ENCODER_PROFILES (default ENCODER_PROFILE, atau profil draft).
+    threads: thread ffmpeg per encode; None = dibagi rata dari core yang tersedia.
+    output_dir: folder file output (default folder kerja).
+    frame_workers > 1 (engine pipe): frame dirender paralel lewat ring shared_memory
+    berisi ring_depth slot (tulis_video_paralel).
+    variants: nama OUTPUT_VARIANTS; frame dirender sekali di ukuran varian terbesar lalu
+    semua varian di-encode satu proses ffmpeg (engine pipe) ke *_<varian>.mp4. Profil tiap
+    varian dari OUTPUT_VARIANTS (`encoder` diabaikan), thread ffmpeg dibagi rata antar varian.
+    frame_spool: folder spool frame mentah; frame dirender ke spool (FrameSpool) lalu di-encode
+    dari mmap. Spool yang sudah ada untuk rencana yang sama dipakai ulang tanpa render;
+    spool_keep mengikuti FRAME_SPOOL_KEEP ("gagal" atau "selalu").
+    pix_fmt: format piksel render (default RENDER_PIX_FMT; "yuv420p" lihat pix_fmt_render).
+    Semua output ditulis ke nama_sementara lalu di-rename atomik setelah encode sukses, jadi file
+    dengan nama final selalu lengkap; file sementara dihapus jika gagal.
+    """
+    engine = engine or OUTPUT_ENGINE
+    if frame_spool and engine != "pipe":
+        print(f"ℹ️ Frame spool is encoded by the pipe writer: engine {engine} -> pipe")
+        engine = "pipe"
+    plan = rencana_varian(variants) if variants else []
+    if plan and draft:
+        raise ValueError("variants cannot be combined with draft")
+    if plan:
+        if engine != "pipe":
+            print(f"ℹ️ Variants are encoded from one frame stream: engine {engine} -> pipe")
+            engine = "pipe"
+        size, fps = plan[0][1], FPS
+        encoder = plan[0][2]
+        fname = f"output_video_multiline_v2_{(i or 0)+1}_{plan[0][0]}.mp4"
+    elif draft:
+        size, fps = ukuran_skala(DRAFT_SCALE), DRAFT_FPS
+        encoder = encoder or DRAFT_ENCODER_PROFILE
+        fname = f"output_video_multiline_v2_{(i or 0)+1}_draft.mp4"
+    else:
+        size, fps = VIDEO_SIZE, FPS
+        encoder = encoder or ENCODER_PROFILE
+        fname = f"output_video_multiline_v2_{(i or 0)+1}.mp4"
+    outputs = {name: f"output_video_multiline_v2_{(i or 0)+1}_{name}.mp4" for name, _, _ in plan}
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        fname = os.path.join(output_dir, fname)
+        outputs = {name: os.path.join(output_dir, path) for name, path in outputs.items()}
+    if threads is None:
+        threads = thread_encoder(workers if engine == "segments" else 1)
+    if plan:
+        threads = max(1, threads // len(plan))
+    tmp_name = nama_sementara(fname)
+    extra = [(nama_sementara(outputs[name]), out_size, profile) for name, out_size, profile in plan[1:]]
+    rename = [(tmp_name, fname)] + [(nama_sementara(outputs[name]), outputs[name]) for name, _, _ in plan[1:]]
+    pix_fmt = pix_fmt_render(pix_fmt, encoder, size, engine)
+    result = {"index": i or 0, "judul": data.get("Judul", ""), "output": fname, "ok": False, "error": None}
+    if plan:
+        result["outputs"] = outputs
+    telemetry = RenderTelemetry(fname, **telemetry_opts) if telemetry_opts else None
+    if telemetry:
+        telemetry.start()
+    t0 = time.time()
+    try:
+        for _, final in rename:
+            hapus_sementara_basi(final)
+        print(f"\n🎬 STARTING VIDEO {i+1 if i is not None else 1}")
+        print("=" * 60)
+        print(f"📝 Title: {data.get('Judul', 'No Title')}")
+
+        specs = rencana_segmen(data, verbose=True, size=size, fps=fps, pix_fmt=pix_fmt)
+        print(f"🎥 Encoding ({engine}, {size[0]}x{size[1]}@{fps}, {pix_fmt}, {encoder}, {threads} threads): {fname}")
+        for name, out_size, profile in plan[1:]:
+            print(f"   + {name} ({out_size[0]}x{out_size[1]}, {profile}): {outputs[name]}")
+        if engine == "segments":
+            with telemetry.stage("segments") if telemetry else _no_stage():
+                tulis_video_segmen(specs, tmp_name, workers=workers, threads=threads, cache_dir=cache_dir,
+                                   profile=encoder)
+        elif frame_spool:
+            spool_path = frame_spool_path(frame_spool, specs)
+            result["spool"] = spool_path
+            if os.path.exists(spool_path):
+                os.utime(spool_path)  # LRU: spool dipakai
+                print(f"♻️ Frame spool reused (no render): {spool_path}")
+            else:
+                os.makedirs(frame_spool, exist_ok=True)
+                # Batas ukuran dicek sebelum spool baru ditulis, jadi spool ini tidak ikut terhapus
+                evict_segment_cache(frame_spool, FRAME_SPOOL_MAX_BYTES, suffix=".vgraw")
+                with telemetry.stage("layout") if telemetry else _no_stage():
+                    timeline = susun_timeline(specs, telemetry)
+                with telemetry.stage("spool") if telemetry else _no_stage():
+                    tulis_spool_frame(timeline, spool_path, meta={"judul": result["judul"], "index": i or 0,
+                                                                  "output": os.path.basename(fname)})
+                print(f"💽 Frame spool written: {spool_path} ({os.path.getsize(spool_path) / 1e6:.0f} MB)")
+            encode_spool(spool_path, tmp_name, threads=threads, profile=encoder, variants=extra, telemetry=telemetry)
+            if spool_keep != "selalu":
+                os.remove(spool_path)
+                result["spool"] = None
+        else:
+            with telemetry.stage("layout") if telemetry else _no_stage():
+                timeline = susun_timeline(specs, telemetry)
+            total_n = sum(c.n_frames for c in timeline)
+            held_n = sum(c.held_frames() for c in timeline)
+            print(f"🧊 Held frames: {held_n}/{total_n} (rendered once, duplicated to encoder)")
+            if engine == "pipe" and frame_workers > 1:
+                tulis_video_paralel(specs, timeline, tmp_name, frame_workers=frame_workers, depth=ring_depth,
+                                    threads=threads, telemetry=telemetry, profile=encoder, variants=extra)
+            elif engine == "pipe":
+                tulis_video_pipe(timeline, tmp_name, threads=threads, telemetry=telemetry, profile=encoder,
+                                 variants=extra)
+            else:
+                tulis_video_moviepy(timeline, tmp_name, threads=threads, telemetry=telemetry, profile=encoder)
+        for tmp, final in rename:
+            os.replace(tmp, final)
         print(f"✅ Done: {fname}")
+        result["ok"] = True
     except Exception as e:
         print(f"❌ VIDEO FAILED: {e}")
         traceback.print_exc()
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        # Output setengah jadi tidak pernah tertinggal dengan nama final
+        for tmp, _ in rename:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    result["seconds"] = round(time.time() - t0, 2)
+    if telemetry:
+        report = telemetry.finish(judul=result["judul"], engine=engine, ok=result["ok"], error=result["error"])
+        result["metrics"] = {k: v for k, v in report.items() if k not in ("clips", "tracemalloc_top")}
+        if report["fallback_frames"]:
+            print(f"⚠️ {report['fallback_frames']} fallback (black) frames in {fname}")
+    return result
+
+
+# ---------- BATCH PARALEL ----------
+def estimasi_durasi_artikel(data):
+    """Perkiraan durasi video (detik) dari rencana segmen (hitung_durasi_isi/durasi_judul_awal)."""
+    return sum(spec["durasi"] for spec in rencana_segmen(data))
+
+
+def _warmup_worker():
+    """Muat font dan overlay sekali per proses worker sebelum artikel pertama."""
+    for key, path in FONTS.items():
+        load_font_cached(path, ISI_FONT_SIZE if key == "isi" else OPENING_FONT_SIZES[key])
+    if os.path.exists(OVERLAY_FILE):
+        load_overlay_layer()
+
+
+def _render_job(job):
+    i, data, opts = job
+    return buat_video_stable(data, i, **opts)
+
+
+def render_batch(articles, workers=1, engine=None, threads=None, cache_dir=None, telemetry_opts=None, window=None,
+                 draft=False, encoder=None, output_dir=None, on_result=None, pool=None, frame_workers=1,
+                 ring_depth=FRAME_RING_DEPTH, variants=None, frame_spool=None, spool_keep=FRAME_SPOOL_KEEP,
+                 pix_fmt=None, journal=None, resume=False):
+    """
+    Render artikel dari iterable (indeks, data) — boleh generator streaming.
+    Dengan beberapa worker, artikel dijadwalkan terpanjang dulu (estimasi dari
+    hitung_durasi_isi/durasi_judul_awal) di dalam jendela lookahead terbatas, jadi
+    render mulai segera dan memori tidak tergantung jumlah artikel.
+    Engine "segments" memakai worker untuk segmen di dalam artikel, artikel berurutan.
+    threads None: core dibagi ke sebanyak `workers` encode yang berjalan bersamaan.
+    on_result: callback hasil per artikel begitu selesai (urutan selesai, bukan indeks).
+    pool: ProcessPoolExecutor milik pemanggil (worker tetap hangat antar batch); tidak ditutup.
+    frame_workers/ring_depth: render frame paralel per video (engine pipe), lihat tulis_video_paralel.
+    variants: nama OUTPUT_VARIANTS per artikel (lihat buat_video_stable).
+    frame_spool/spool_keep: render lewat spool frame mentah (lihat buat_video_stable).
+    pix_fmt: format piksel render (lihat pix_fmt_render).
+    journal: path BatchJournal; tiap artikel dicatat running/done/failed beserta sidik_artikel.
+    resume: artikel yang di jurnal sudah done dengan sidik sama dan output masih ada dilewati
+    (hasil ditandai "resumed"); yang gagal, berubah, atau file-nya hilang dirender ulang.
+    Mengembalikan list hasil per artikel.
+    """
+    profil_encoder(encoder)  # nama profil salah -> gagal sebelum batch mulai
+    if variants:
+        rencana_varian(variants)
+        if draft:
+            raise ValueError("variants cannot be combined with draft")
+    if threads is None:
+        threads = thread_encoder(workers)
+    seg_workers = 1
+    if engine == "segments":
+        seg_workers, workers = workers, 1
+
+    opts = {"engine": engine, "threads": threads, "workers": seg_workers, "cache_dir": cache_dir,
+            "telemetry_opts": telemetry_opts, "draft": draft, "encoder": encoder, "output_dir": output_dir,
+            "frame_workers": frame_workers, "ring_depth": ring_depth, "variants": variants,
+            "frame_spool": frame_spool, "spool_keep": spool_keep, "pix_fmt": pix_fmt}
+
+    def job_for(i, d):
+        return (i, d, opts)
+
+    results = []
+    jurnal = BatchJournal(journal) if journal else None
+    opsi_sidik = {"draft": draft, "encoder": encoder, "variants": variants, "pix_fmt": pix_fmt,
+                  "output_dir": output_dir}
+    sidik = {}  # indeks -> sidik_artikel artikel yang sedang/akan dirender
+
+    def mulai(i):
+        if jurnal is not None:
+            jurnal.catat(i, sidik[i], "running")
+
+    def selesai(result):
+        results.append(result)
+        if jurnal is not None:
+            jurnal.catat(result["index"], sidik.pop(result["index"], None), "done" if result["ok"] else "failed",
+                         judul=result["judul"], output=result["output"], outputs=result.get("outputs"),
+                         seconds=result["seconds"], error=result["error"])
+        if on_result:
+            on_result(result)
+
+    def belum_selesai(source):
+        for i, d in source:
+            if jurnal is not None:
+                sidik[i] = sidik_artikel(d, opsi_sidik)
+                if resume and jurnal.sudah_selesai(i, sidik[i]):
+                    rec = jurnal.entries[i]
+                    print(f"⏭️ #{i + 1} already done, skipped: {rec['output']}")
+                    results.append({"index": i, "judul": d.get("Judul", ""), "output": rec["output"], "ok": True,
+                                    "error": None, "seconds": rec.get("seconds"), "resumed": True,
+                                    **({"outputs": rec["outputs"]} if rec.get("outputs") else {})})
+                    del sidik[i]
+                    continue
+            yield i, d
+
+    articles = belum_selesai(articles)
+    try:
+        _jalankan_batch(articles, workers, pool, window, job_for, mulai, selesai)
+    finally:
+        if jurnal is not None:
+            jurnal.close()
+    results.sort(key=lambda r: r["index"])
+    return results
+
+
+def _jalankan_batch(articles, workers, pool, window, job_for, mulai, selesai):
+    """
+    Loop penjadwalan render_batch: berurutan (workers <= 1) atau terpanjang-dulu di pool proses.
+    Worker yang mati (mis. OOM) merusak pool: artikel yang sedang berjalan dicatat gagal. Pool
+    milik loop ini dibuat ulang dan batch jalan terus; pool milik pemanggil tidak bisa diganti,
+    jadi semua artikel yang belum jalan dicatat gagal lalu loop berhenti.
+    """
+    if workers <= 1:
+        _warmup_worker()
+        for i, d in articles:
+            mulai(i)
+            selesai(_render_job(job_for(i, d)))
+        return
+
+    def gagal(i, d, e):
+        selesai({"index": i, "judul": d.get("Judul", ""), "output": None, "ok": False,
+                 "error": f"{type(e).__name__}: {e}", "seconds": None})
+
+    window = window or workers * 4
+    source = iter(articles)
+    pending = []  # (estimasi, i, data), diurutkan saat dipilih
+    exhausted = False
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_warmup_worker)
+    try:
+        running = {}
+        while True:
+            while not exhausted and len(pending) < window:
+                try:
+                    i, d = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.append((estimasi_durasi_artikel(d), i, d))
+            while pending and len(running) < workers:
+                pending.sort(key=lambda item: item[0])
+                _, i, d = pending.pop()
+                mulai(i)
+                try:
+                    fut = pool.submit(_render_job, job_for(i, d))
+                except BrokenProcessPool as e:
+                    if not own_pool:
+                        gagal(i, d, e)
+                        for _, i, d in pending:
+                            gagal(i, d, e)
+                        for i, d in source:
+                            gagal(i, d, e)
+                        pending, exhausted = [], True
+                        break
+                    print(f"⚠️ Worker pool broken ({e}), restarting workers")
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = ProcessPoolExecutor(max_workers=workers, initializer=_warmup_worker)
+                    fut = pool.submit(_render_job, job_for(i, d))
+                running[fut] = (i, d)
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                i, data = running.pop(fut)
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    # Worker mati (mis. OOM) — catat sebagai gagal; pool rusak ditangani saat submit berikutnya
+                    gagal(i, data, e)
+                    continue
+                selesai(result)
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+
+def parse_shard(text):
+    """'START:END' (indeks artikel 0-based, END eksklusif, boleh kosong) -> (start, end)."""
+    start, _, end = text.partition(":")
+    return (int(start) if start else 0, int(end) if end else None)
+
+
+# ---------- JURNAL BATCH ----------
+def sidik_artikel(data, opsi):
+    """Hash isi artikel + opsi yang menentukan file output (berubah -> artikel dirender ulang saat resume)."""
+    payload = json.dumps({"data": data, "opsi": opsi, "renderer": RENDERER_VERSION},
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BatchJournal:
+    """
+    Jurnal batch JSONL append-only: satu record per perubahan status artikel
+    {index, hash, status running/done/failed, judul, output, outputs, seconds, error, t}.
+    Tiap record di-flush + fsync, jadi crash paling banyak memotong baris terakhir
+    (diabaikan saat dibaca). Record terakhir per indeks yang berlaku.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        rapi = True
+        if os.path.exists(path):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    rapi = line.endswith("\n")
+                    try:
+                        rec = json.loads(line)
+                        self.entries[rec["index"]] = rec
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._f = open(path, "a", encoding="utf-8")
+        if not rapi:
+            self._f.write("\n")  # baris terpotong jangan menyambung ke record baru
+
+    def catat(self, index, sidik, status, **info):
+        rec = {"index": index, "hash": sidik, "status": status, **info, "t": round(time.time(), 3)}
+        self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self.entries[index] = rec
+
+    def sudah_selesai(self, index, sidik):
+        """True jika artikel done dengan sidik sama dan semua file output-nya masih ada."""
+        rec = self.entries.get(index)
+        if not rec or rec["status"] != "done" or rec.get("hash") != sidik:
+            return False
+        paths = [rec.get("output")] + list((rec.get("outputs") or {}).values())
+        return all(path and os.path.exists(path) for path in paths)
+
+    def close(self):
+        self._f.close()
+
+
+# ---------- BULETIN ----------
+def tulis_json_atomik(path, obj):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _escape_ffmetadata(text):
+    return re.sub(r"([=;#\\\n])", r"\\\1", text)
+
+
+def tulis_chapter_ffmetadata(path, chapters, total_s, title=None):
+    """Chapter dalam format FFMETADATA1 (ms); END chapter = START berikutnya."""
+    lines = [";FFMETADATA1"]
+    if title:
+        lines.append(f"title={_escape_ffmetadata(title)}")
+    for n, ch in enumerate(chapters):
+        end_s = chapters[n + 1]["start_s"] if n + 1 < len(chapters) else total_s
+        lines += ["[CHAPTER]", "TIMEBASE=1/1000", f"START={int(round(ch['start_s'] * 1000))}",
+                  f"END={int(round(end_s * 1000))}", f"title={_escape_ffmetadata(ch['judul'] or f'Berita {n + 1}')}"]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def sematkan_chapter(fname, meta_path):
+    """Remux (stream copy) agar chapter ikut di dalam file MP4."""
+    tmp = fname[:-len(".mp4")] + f".chapters-{os.getpid()}.mp4" if fname.endswith(".mp4") else fname + ".tmp"
+    cmd = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", "-i", fname, "-i", meta_path,
+           "-map", "0", "-map_metadata", "1", "-map_chapters", "1", "-codec", "copy", "-f", "mp4", tmp]
+    try:
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        os.replace(tmp, fname)
+    except subprocess.CalledProcessError as e:
+        raise IOError(f"ffmpeg chapter remux failed for {fname}: {e.stderr.decode('utf-8', 'replace').strip()}")
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def buat_buletin(articles, fname="buletin.mp4", draft=False, encoder=None, threads=None, frame_workers=1,
+                 ring_depth=FRAME_RING_DEPTH, title=None, pix_fmt=None):
+    """
+    Satu video panjang dari banyak artikel (iterable (indeks, data), boleh streaming),
+    ditulis ke satu encoder ffmpeg. Timeline dibangun per artikel, ditulis, lalu dibuang,
+    jadi memori puncak tidak bergantung jumlah berita (cache layout/ukuran terbatas).
+    Antar berita ada separator BULETIN_SEPARATOR_S detik; penutup hanya di akhir.
+    Indeks chapter (waktu mulai tiap berita) ditulis ke <fname>.chapters.json dan
+    disematkan sebagai chapter MP4. Artikel yang gagal di-layout dilewati.
+    Video ditulis ke nama_sementara dan baru di-rename ke fname setelah lengkap.
+    """
+    if draft:
+        size, fps = ukuran_skala(DRAFT_SCALE), DRAFT_FPS
+        encoder = encoder or DRAFT_ENCODER_PROFILE
+    else:
+        size, fps = VIDEO_SIZE, FPS
+        encoder = encoder or ENCODER_PROFILE
+    threads = threads if threads is not None else thread_encoder(1)
+    pix_fmt = pix_fmt_render(pix_fmt, encoder, size)
+    render = {"size": tuple(size), "fps": fps}
+    if pix_fmt != "rgb24":
+        render["pix_fmt"] = pix_fmt
+    separator = susun_timeline([dict(render, jenis="separator", durasi=BULETIN_SEPARATOR_S)])
+    chapters = []
+    skipped = []
+    t0 = time.time()
+    print(f"📰 Bulletin ({size[0]}x{size[1]}@{fps}, {pix_fmt}, {encoder}): {fname}")
+    tmp_name = nama_sementara(fname)
+    writer = FfmpegPipeWriter(tmp_name, size, fps, codec="libx264", profile=encoder, threads=threads,
+                              input_pix_fmt=pix_fmt)
+    try:
+        try:
+            for i, data in articles:
+                try:
+                    specs = rencana_segmen(data, size=size, fps=fps, penutup=False, pix_fmt=pix_fmt)
+                    timeline = susun_timeline(specs)
+                except Exception as e:
+                    print(f"❌ Story #{i + 1} skipped: {e}")
+                    skipped.append({"index": i, "judul": data.get("Judul", ""),
+                                    "error": f"{type(e).__name__}: {e}"})
+                    continue
+                if chapters:
+                    tulis_timeline(writer, separator)
+                start = writer.frames_written
+                if frame_workers > 1:
+                    tulis_frame_paralel(writer, specs, timeline, frame_workers, ring_depth)
+                else:
+                    tulis_timeline(writer, timeline)
+                chapters.append({"index": i, "judul": data.get("Judul", ""), "start_s": round(start / fps, 3),
+                                 "start_frame": start, "duration_s": round((writer.frames_written - start) / fps, 3)})
+                del timeline
+                gc.collect()  # klip saling mereferensi (closure overlay); bebaskan frame sebelum berita berikutnya
+                print(f"   #{len(chapters)} {chapters[-1]['start_s']:8.2f}s  {chapters[-1]['judul'][:60]} "
+                      f"(peak RSS {_peak_rss_mb('self')} MB)")
+            if chapters:
+                tulis_timeline(writer, susun_timeline([dict(render, jenis="separator", durasi=3.0)]))
+        finally:
+            writer.close()
+        total_s = writer.frames_written / fps
+        result = {"output": fname, "ok": bool(chapters), "stories": len(chapters), "skipped": skipped,
+                  "duration_s": round(total_s, 3), "seconds": round(time.time() - t0, 2),
+                  "peak_rss_mb": _peak_rss_mb("self"), "chapters": chapters}
+        if not chapters:
+            return result
+        index_path = fname + ".chapters.json"
+        tulis_json_atomik(index_path, {k: v for k, v in result.items() if k != "ok"})
+        result["chapters_path"] = index_path
+        meta_path = fname + ".ffmetadata.txt"
+        try:
+            tulis_chapter_ffmetadata(meta_path, chapters, total_s, title=title)
+            sematkan_chapter(tmp_name, meta_path)
+        except IOError as e:
+            print(f"⚠️ Chapters not embedded ({e}); see {index_path}")
+        finally:
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+        os.replace(tmp_name, fname)  # buletin hanya muncul dengan nama final setelah lengkap
+        return result
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+
+
+# ---------- WORKER HANGAT ----------
+# Spool: job JSON ditaruh di masuk/ (langsung atau lewat HTTP), diklaim worker dengan
+# os.replace ke proses/, status + hasil per job ditulis atomik ke hasil/<id>.json,
+# video ke hasil/<id>/, lalu file job dipindah ke selesai/ atau gagal/.
+SPOOL_SUBDIRS = ("masuk", "proses", "hasil", "selesai", "gagal")
+ENGINES = ("moviepy", "pipe", "segments")
+
+
+def proses_hidup(pid):
+    """True jika proses `pid` (di mesin ini) masih berjalan."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # ada, milik user lain
+    return True
+
+
+def nama_klaim(name, pid=None):
+    """Nama job di proses/ menyimpan pid pemiliknya: <id>.json -> <id>.<pid>.json."""
+    return f"{name[:-len('.json')]}.{pid or os.getpid()}.json"
+
+
+def pemilik_klaim(name):
+    """Nama file di proses/ -> (nama job asli, pid pemilik atau None untuk klaim tanpa pid)."""
+    job_id, _, pid = name[:-len(".json")].rpartition(".")
+    if job_id and pid.isdigit():
+        return f"{job_id}.json", int(pid)
+    return name, None
+
+
+def siapkan_spool(spool_dir):
+    """
+    Buat subfolder spool; job yang tertinggal di proses/ karena pemiliknya mati di tengah job
+    kembali ke masuk/. Job milik worker lain yang masih hidup (spool bersama) dibiarkan.
+    """
+    for sub in SPOOL_SUBDIRS:
+        os.makedirs(os.path.join(spool_dir, sub), exist_ok=True)
+    recovered = []
+    for name in sorted(os.listdir(os.path.join(spool_dir, "proses"))):
+        job, pid = pemilik_klaim(name)
+        if pid is not None and pid != os.getpid() and proses_hidup(pid):
+            continue
+        try:
+            os.replace(os.path.join(spool_dir, "proses", name), os.path.join(spool_dir, "masuk", job))
+        except FileNotFoundError:
+            continue  # sudah dipulihkan worker lain yang mulai bersamaan
+        recovered.append(job)
+    return recovered
+
+
+def parse_job(obj):
+    """
+    Isi job -> (daftar artikel, opsi). Diterima: satu artikel (skema JSONL), list artikel,
+    atau {"articles": [...], "engine", "draft", "encoder", "variants"}. ValueError jika tidak valid.
+    """
+    opsi = {}
+    if isinstance(obj, dict) and "articles" in obj:
+        opsi = {k: obj[k] for k in ("engine", "draft", "encoder", "variants") if obj.get(k) is not None}
+        obj = obj["articles"]
+    items = obj if isinstance(obj, list) else [obj]
+    if not items:
+        raise ValueError("job has no articles")
+    if opsi.get("engine", ENGINES[0]) not in ENGINES:
+        raise ValueError(f"unknown engine {opsi['engine']!r}")
+    profil_encoder(opsi.get("encoder"))
+    if "draft" in opsi:
+        opsi["draft"] = bool(opsi["draft"])
+    if "variants" in opsi:
+        if isinstance(opsi["variants"], str):
+            opsi["variants"] = opsi["variants"].split(",")
+        opsi["variants"] = [name for name, _, _ in rencana_varian(list(opsi["variants"]))]
+    articles = []
+    for n, item in enumerate(items):
+        try:
+            articles.append(normalisasi_artikel(item))
+        except ValueError as e:
+            raise ValueError(f"article #{n + 1}: {e}")
+    return articles, opsi
+
+
+def kirim_job(spool_dir, obj, job_id=None):
+    """Validasi job lalu taruh di spool/masuk (atomik); mengembalikan id job."""
+    parse_job(obj)
+    job_id = job_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{os.urandom(3).hex()}"
+    if not re.fullmatch(r"[\w-]+", job_id):
+        raise ValueError(f"invalid job id {job_id!r}")
+    tulis_json_atomik(os.path.join(spool_dir, "hasil", f"{job_id}.json"),
+                      {"id": job_id, "status": "queued", "submitted": time.time()})
+    tulis_json_atomik(os.path.join(spool_dir, "masuk", f"{job_id}.json"), obj)
+    return job_id
+
+
+class RenderWorker:
+    """
+    Worker render yang berjalan terus: font, overlay, cache ukuran dan layout tetap
+    hangat di proses ini (dan di pool worker jika workers > 1), jadi job berikutnya
+    tidak membayar import moviepy, load font dan resize overlay lagi.
+    Job diproses berurutan (FIFO per waktu masuk); satu job boleh berisi banyak artikel.
+    """
+
+    def __init__(self, spool_dir, workers=1, engine=None, threads=None, cache_dir=None, telemetry_opts=None,
+                 draft=False, encoder=None, frame_workers=1, ring_depth=FRAME_RING_DEPTH, poll_s=SPOOL_POLL_S,
+                 variants=None, frame_spool=None, spool_keep=FRAME_SPOOL_KEEP, pix_fmt=None):
+        self.spool_dir = spool_dir
+        self.workers = workers
+        self.defaults = {"engine": engine or OUTPUT_ENGINE, "draft": draft, "encoder": encoder, "variants": variants}
+        self.threads = threads
+        self.cache_dir = cache_dir
+        self.telemetry_opts = telemetry_opts
+        self.frame_workers = frame_workers
+        self.ring_depth = ring_depth
+        self.frame_spool = frame_spool
+        self.spool_keep = spool_keep
+        self.pix_fmt = pix_fmt
+        self.poll_s = poll_s
+        self.wake = threading.Event()
+        self.stopping = False
+        self.current = None
+        self.jobs_done = 0
+        self.jobs_failed = 0
+        self.started = time.time()
+        self._pool = None
+
+    def _path(self, sub, name):
+        return os.path.join(self.spool_dir, sub, name)
+
+    def antrian(self):
+        """Nama file job di masuk/, terlama dulu."""
+        jobs = []
+        for name in os.listdir(self._path("masuk", "")):
+            if not name.endswith(".json"):
+                continue
+            try:
+                jobs.append((os.path.getmtime(self._path("masuk", name)), name))
+            except OSError:
+                continue  # baru saja diklaim worker lain
+        return [name for _, name in sorted(jobs)]
+
+    def status(self, job_id):
+        if not re.fullmatch(r"[\w-]+", job_id):
+            return None  # id dari URL: jangan sampai keluar dari hasil/
+        try:
+            with open(self._path("hasil", f"{job_id}.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def health(self):
+        return {"ok": True, "pid": os.getpid(), "uptime_s": round(time.time() - self.started, 1),
+                "current": self.current, "queued": len(self.antrian()), "jobs_done": self.jobs_done,
+                "jobs_failed": self.jobs_failed}
+
+    def pool(self):
+        if self.workers > 1 and self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warmup_worker)
+        return self._pool
+
+    def _reset_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def proses(self, name):
+        """Klaim dan render satu job; False jika job sudah diklaim worker lain."""
+        job_id = name[:-len(".json")]
+        path = self._path("proses", nama_klaim(name))
+        try:
+            os.replace(self._path("masuk", name), path)
+        except FileNotFoundError:
+            return False
+        self.current = job_id
+        report = self.status(job_id) or {"id": job_id, "submitted": os.path.getmtime(path)}
+        report.update({"status": "running", "started": time.time(), "results": []})
+        report_path = self._path("hasil", f"{job_id}.json")
+        ok = False
+        try:
+            with open(path, encoding="utf-8-sig") as f:
+                articles, opsi = parse_job(json.load(f))
+            opsi = {**self.defaults, **opsi}
+            report.update({"articles": len(articles), "done": 0, "options": opsi})
+            tulis_json_atomik(report_path, report)
+            print(f"\n📥 Job {job_id}: {len(articles)} article(s), {opsi}")
+
+            def on_result(result):
+                report["done"] += 1
+                report["results"].append(result)
+                tulis_json_atomik(report_path, report)
+
+            results = render_batch(enumerate(articles), workers=self.workers, threads=self.threads,
+                                   cache_dir=self.cache_dir, telemetry_opts=self.telemetry_opts,
+                                   output_dir=self._path("hasil", job_id), on_result=on_result,
+                                   pool=self.pool(), frame_workers=self.frame_workers,
+                                   ring_depth=self.ring_depth, frame_spool=self.frame_spool,
+                                   spool_keep=self.spool_keep, pix_fmt=self.pix_fmt, **opsi)
+            report["results"] = results
+            ok = any(r["ok"] for r in results)
+            if any((r["error"] or "").startswith("BrokenProcessPool") for r in results):
+                self._reset_pool()
+            report["status"] = "done" if ok else "failed"
+        except BrokenProcessPool as e:
+            self._reset_pool()
+            report.update({"status": "failed", "error": f"{type(e).__name__}: {e}"})
+        except ValueError as e:  # Job tidak valid (JSON rusak, artikel kosong, opsi salah)
+            report.update({"status": "failed", "error": f"{type(e).__name__}: {e}"})
+        except Exception as e:
+            traceback.print_exc()
+            report.update({"status": "failed", "error": f"{type(e).__name__}: {e}"})
+        report["finished"] = time.time()
+        report["seconds"] = round(report["finished"] - report["started"], 2)
+        tulis_json_atomik(report_path, report)
+        os.replace(path, self._path("selesai" if ok else "gagal", name))
+        self.current = None
+        if ok:
+            self.jobs_done += 1
+        else:
+            self.jobs_failed += 1
+        print(f"{'✅' if ok else '❌'} Job {job_id} {report['status']} in {report['seconds']}s")
+        return True
+
+    def jalankan(self, drain=False, http_port=None):
+        """
+        Loop utama: proses job di masuk/ sampai stop() (mis. dari SIGTERM; job yang sedang
+        berjalan diselesaikan dulu). Job yang terputus (Ctrl+C, crash) tetap di proses/ dan
+        diantrikan ulang saat worker berikutnya mulai. drain=True: keluar begitu antrian kosong.
+        http_port: juga terima job lewat layani_http di 127.0.0.1.
+        """
+        recovered = siapkan_spool(self.spool_dir)
+        if recovered:
+            print(f"♻️ Re-queued {len(recovered)} interrupted job(s)")
+        server = layani_http(self, http_port) if http_port is not None else None
+        t0 = time.time()
+        _warmup_worker()
+        self.pool()
+        print(f"🔥 Worker warm in {time.time() - t0:.2f}s, watching {self.spool_dir}")
+        try:
+            while not self.stopping:
+                names = self.antrian()
+                if not names:
+                    if drain:
+                        break
+                    self.wake.wait(self.poll_s)
+                    self.wake.clear()
+                    continue
+                self.proses(names[0])
+        finally:
+            self._reset_pool()
+            if server:
+                server.shutdown()
+        print(f"👋 Worker stopped: {self.jobs_done} done, {self.jobs_failed} failed")
+
+    def stop(self, *_):
+        self.stopping = True
+        self.wake.set()
+
+
+def layani_http(worker, port, host="127.0.0.1"):
+    """
+    Endpoint HTTP lokal di thread daemon, front-end untuk spool yang sama:
+    POST /jobs (body job JSON) -> 202 {"id"}; GET /jobs/<id> -> status; GET /health.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def _json(self, code, obj):
+            body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                return self._json(200, worker.health())
+            if self.path.startswith("/jobs/"):
+                report = worker.status(self.path[len("/jobs/"):])
+                return self._json(200, report) if report else self._json(404, {"error": "unknown job"})
+            self._json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/jobs":
+                return self._json(404, {"error": "not found"})
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                job_id = kirim_job(worker.spool_dir, json.loads(self.rfile.read(length)))
+            except ValueError as e:
+                return self._json(400, {"error": str(e)})
+            worker.wake.set()
+            self._json(202, {"id": job_id, "status": f"/jobs/{job_id}"})
+
+        def log_message(self, *_):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"🌐 Listening on http://{host}:{server.server_address[1]}")
+    return server
 
 
 # ---------- MAIN ----------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multiline highlight video generator")
+    parser.add_argument("input", nargs="?", default="data_berita.txt",
+                        help="File artikel: format data_berita.txt, .jsonl atau .csv")
+    parser.add_argument("--format", choices=["txt", "jsonl", "csv"],
+                        help="Format input (default: dari ekstensi file)")
+    parser.add_argument("--shard", help="Rentang indeks artikel START:END (0-based, END eksklusif)")
+    parser.add_argument("--engine", choices=["moviepy", "pipe", "segments"], default=OUTPUT_ENGINE,
+                        help="moviepy: compose + write_videofile; pipe: frame langsung ke stdin ffmpeg; "
+                             "segments: segmen per paragraf paralel + concat tanpa re-encode")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Jumlah proses render paralel (default 1 = berurutan); "
+                             "untuk engine segments: worker per segmen")
+    parser.add_argument("--frame-workers", type=int, default=1,
+                        help="Engine pipe: jumlah proses render frame per video (ring shared_memory)")
+    parser.add_argument("--ring-depth", type=int, default=FRAME_RING_DEPTH,
+                        help="Jumlah slot frame di ring --frame-workers (batas memori + backpressure)")
+    parser.add_argument("--ffmpeg-threads", type=int,
+                        help="Thread ffmpeg per encode (default: jumlah core dibagi jumlah encode paralel)")
+    parser.add_argument("--encoder", choices=list(ENCODER_PROFILES),
+                        help=f"Profil encoder (default {ENCODER_PROFILE}; {DRAFT_ENCODER_PROFILE} untuk --draft)")
+    parser.add_argument("--segment-cache", default=SEGMENT_CACHE_DIR,
+                        help="Folder cache segmen untuk engine segments (kosongkan untuk menonaktifkan)")
+    parser.add_argument("--draft", action="store_true",
+                        help=f"Pratinjau cepat: resolusi x{DRAFT_SCALE}, {DRAFT_FPS} fps, profil {DRAFT_ENCODER_PROFILE} "
+                             "(layout sama dengan hasil akhir) ke *_draft.mp4")
+    parser.add_argument("--varian", type=lambda v: v.split(","), metavar="NAMA[,NAMA...]",
+                        help=f"Beberapa output dari satu render ({', '.join(OUTPUT_VARIANTS)}); "
+                             "di-encode satu proses ffmpeg ke *_<varian>.mp4")
+    parser.add_argument("--spool-frame", metavar="DIR",
+                        help="Render ke spool frame mentah (mmap) di DIR lalu encode dari situ; spool yang "
+                             "sama dipakai ulang. Default spool dihapus setelah encode sukses")
+    parser.add_argument("--simpan-spool", action="store_true",
+                        help="Dengan --spool-frame: spool tetap disimpan setelah encode sukses")
+    parser.add_argument("--dari-spool", nargs="+", metavar="FILE_VGRAW",
+                        help="Tanpa render: encode ulang spool dengan --encoder ke <output>_<encoder>.mp4")
+    parser.add_argument("--yuv", action="store_true",
+                        help="Render langsung di yuv420p (komposit per bidang Y/U/V, input ffmpeg setengah byte RGB)")
+    parser.add_argument("--journal", metavar="FILE_JSONL",
+                        help="Catat status tiap artikel (hash input, output, durasi) ke jurnal batch JSONL")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"Lewati artikel yang di jurnal sudah selesai dan tidak berubah (default jurnal "
+                             f"{BATCH_JOURNAL})")
+    parser.add_argument("--metrics", help="Tambahkan metrik JSON (satu baris per klip dan per video) ke file ini")
+    parser.add_argument("--profile-dir", help="Simpan cProfile per video (.prof) ke folder ini")
+    parser.add_argument("--tracemalloc", action="store_true", help="Catat peak alokasi Python per video")
+    parser.add_argument("--output-dir", help="Folder output video (default: folder kerja)")
+    parser.add_argument("--keyframes", metavar="FILE_JSONL",
+                        help="Tanpa render: tulis keyframe wipe/highlight tiap artikel (satu baris JSON per artikel)")
+    parser.add_argument("--still", metavar="FILE_PNG",
+                        help="Tanpa video: satu frame per artikel (--frame/--waktu, default poster) ke FILE_<n>.png")
+    parser.add_argument("--frame", type=int, help="Dengan --still: indeks frame global (negatif dari akhir)")
+    parser.add_argument("--waktu", type=float, metavar="DETIK", help="Dengan --still: posisi frame dalam detik")
+    parser.add_argument("--contact-sheet", metavar="FILE_PNG",
+                        help="Tanpa video: lembar kontak per artikel (akhir opening dan tiap Isi_N) ke FILE_<n>.png")
+    parser.add_argument("--buletin", metavar="FILE_MP4",
+                        help="Gabungkan semua artikel input jadi satu video buletin (+ FILE_MP4.chapters.json)")
+    parser.add_argument("--serve", metavar="SPOOL_DIR",
+                        help="Mode worker hangat: proses job JSON dari SPOOL_DIR/masuk terus-menerus")
+    parser.add_argument("--http", type=int, metavar="PORT",
+                        help="Dengan --serve: terima job lewat HTTP di 127.0.0.1:PORT")
+    parser.add_argument("--drain", action="store_true", help="Dengan --serve: keluar saat antrian kosong")
+    args = parser.parse_args()
+    if args.varian:
+        if args.draft or args.buletin:
+            parser.error("--varian cannot be combined with --draft or --buletin")
+        try:
+            rencana_varian(args.varian)
+        except ValueError as e:
+            parser.error(str(e))
+
     print("🚀 MULTILINE HIGHLIGHT VIDEO GENERATOR (V2)")
-    FILE_INPUT = "data_berita.txt"
+    telemetry_opts = None
+    if args.metrics or args.profile_dir or args.tracemalloc:
+        telemetry_opts = {"metrics_path": args.metrics, "profile_dir": args.profile_dir,
+                          "trace_memory": args.tracemalloc}
+
+    if args.serve:
+        worker = RenderWorker(args.serve, workers=args.workers, engine=args.engine, threads=args.ffmpeg_threads,
+                              cache_dir=args.segment_cache or None, telemetry_opts=telemetry_opts,
+                              draft=args.draft, encoder=args.encoder, frame_workers=args.frame_workers,
+                              ring_depth=args.ring_depth, variants=args.varian, frame_spool=args.spool_frame,
+                              spool_keep="selalu" if args.simpan_spool else FRAME_SPOOL_KEEP,
+                              pix_fmt="yuv420p" if args.yuv else None)
+        signal.signal(signal.SIGTERM, worker.stop)
+        worker.jalankan(drain=args.drain, http_port=args.http)
+        sys.exit(0)
+
+    if args.dari_spool:
+        encoder = args.encoder or ENCODER_PROFILE
+        failed = 0
+        for path in args.dari_spool:
+            t0 = time.time()
+            try:
+                header = FrameSpool(path).header
+                stem = os.path.splitext(header.get("output") or os.path.basename(path))[0]
+                fname = f"{stem}_{encoder}.mp4"
+                if args.output_dir:
+                    os.makedirs(args.output_dir, exist_ok=True)
+                    fname = os.path.join(args.output_dir, fname)
+                tmp = nama_sementara(fname)
+                try:
+                    encode_spool(path, tmp, threads=args.ffmpeg_threads or thread_encoder(), profile=encoder)
+                    os.replace(tmp, fname)
+                finally:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+                print(f"✅ {path} -> {fname} ({header['frames']} frames, {time.time() - t0:.1f}s)")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"❌ {path}: {e}")
+                failed += 1
+        sys.exit(1 if failed else 0)
+
+    FILE_INPUT = args.input
     if not os.path.exists(FILE_INPUT):
-        print("❌ File data_berita.txt tidak ditemukan.")
+        print(f"❌ File {FILE_INPUT} tidak ditemukan.")
         sys.exit(1)
 
     # Cek font agar tidak langsung gagal
@@ -644,13 +3491,80 @@ if __name__ == "__main__":
         for m in missing:
             print(f"   - {m}")
 
-    data_all = baca_semua_berita_stable(FILE_INPUT)
-    if not data_all:
+    parse_errors = []
+
+    def on_parse_error(err):
+        print(f"⚠️ Article #{err['index'] + 1} skipped (line {err['line']}): {err['error']}")
+        parse_errors.append(err)
+
+    shard = parse_shard(args.shard) if args.shard else None
+    articles = iter_berita(FILE_INPUT, fmt=args.format, shard=shard, on_error=on_parse_error)
+
+    if args.keyframes:
+        size, fps = (ukuran_skala(DRAFT_SCALE), DRAFT_FPS) if args.draft else (VIDEO_SIZE, FPS)
+        n = 0
+        with open(args.keyframes, "w", encoding="utf-8") as f:
+            for i, data in articles:
+                f.write(json.dumps(dict(keyframes_artikel(data, size, fps), index=i), ensure_ascii=False) + "\n")
+                n += 1
+        print(f"🎞️ Keyframes for {n} article(s) written to {args.keyframes}")
+        sys.exit(0 if n else 1)
+
+    if args.still or args.contact_sheet:
+        size, fps = (ukuran_skala(DRAFT_SCALE), DRAFT_FPS) if args.draft else (VIDEO_SIZE, FPS)
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+        n = 0
+        for i, data in articles:
+            t0 = time.perf_counter()
+            if args.still:
+                path = nama_per_artikel(args.still, i, args.output_dir)
+                Image.fromarray(render_frame(data, frame=args.frame, t=args.waktu, size=size, fps=fps)).save(path)
+                print(f"🖼️ Still #{i + 1}: {path}")
+            if args.contact_sheet:
+                path = nama_per_artikel(args.contact_sheet, i, args.output_dir)
+                contact_sheet(data, fps=fps).save(path)
+                print(f"🖼️ Contact sheet #{i + 1}: {path}")
+            print(f"   ⏱️ {(time.perf_counter() - t0) * 1000:.0f} ms")
+            n += 1
+        sys.exit(0 if n else 1)
+
+    if args.buletin:
+        fname = os.path.join(args.output_dir, args.buletin) if args.output_dir else args.buletin
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+        result = buat_buletin(articles, fname, draft=args.draft, encoder=args.encoder, threads=args.ffmpeg_threads,
+                              frame_workers=args.frame_workers, ring_depth=args.ring_depth,
+                              pix_fmt="yuv420p" if args.yuv else None)
+        print(f"\n📋 Bulletin: {result['stories']} stories, {result['duration_s']}s video in {result['seconds']}s, "
+              f"{len(result['skipped'])} skipped, {len(parse_errors)} parse errors, peak RSS {result['peak_rss_mb']} MB")
+        if not result["ok"]:
+            print("❌ No stories rendered")
+            sys.exit(1)
+        print(f"🎉 Bulletin written: {fname} (chapters: {result['chapters_path']})")
+        sys.exit(0)
+
+    print(f"\n🎬 Processing videos from {FILE_INPUT} (workers={args.workers}, shard={args.shard or 'all'})...")
+    results = render_batch(articles, workers=args.workers, engine=args.engine, threads=args.ffmpeg_threads,
+                           cache_dir=args.segment_cache or None, telemetry_opts=telemetry_opts, draft=args.draft,
+                           encoder=args.encoder, output_dir=args.output_dir, frame_workers=args.frame_workers,
+                           ring_depth=args.ring_depth, variants=args.varian, frame_spool=args.spool_frame,
+                           spool_keep="selalu" if args.simpan_spool else FRAME_SPOOL_KEEP,
+                           pix_fmt="yuv420p" if args.yuv else None,
+                           journal=args.journal or (BATCH_JOURNAL if args.resume else None), resume=args.resume)
+    if not results:
         print("❌ No data to process")
         sys.exit(1)
 
-    print(f"\n🎬 Processing {len(data_all)} videos...")
-    for i, d in enumerate(data_all):
-        buat_video_stable(d, i)
+    failed = [r for r in results if not r["ok"]]
+    resumed = sum(1 for r in results if r.get("resumed"))
+    print(f"\n📋 Summary: {len(results) - len(failed)}/{len(results)} succeeded ({resumed} from journal), "
+          f"{len(parse_errors)} parse errors")
+    for err in parse_errors:
+        print(f"   ⚠️ #{err['index'] + 1} line {err['line']}: {err['error']}")
+    for r in failed:
+        print(f"   ❌ #{r['index'] + 1} {r['judul'][:50]!r}: {r['error']}")
+    if len(failed) == len(results):
+        sys.exit(1)
 
     print("\n🎉 ALL VIDEOS COMPLETED!")